@@ -1,11 +1,16 @@
 import pygame
 import math
 from os import path
+from assets import load_image
+from timing import get_ticks
+
+ABILITY_IMAGES = {'heal': 'heal.png', 'speed': 'speed.png', 'invincibility': 'kebal.png'}
 
 class Ability(pygame.sprite.Sprite):
     def __init__(self, pos, ability_type, groups):
         super().__init__(groups)
         self.ability_type = ability_type
+        self.spawn_pos = pos
         self.image = self.load_image(ability_type)
         self.rect = self.image.get_rect(topleft=pos)
         self.original_y = pos[1] 
@@ -14,14 +19,9 @@ class Ability(pygame.sprite.Sprite):
         self.amplitude = 10  
 
     def load_image(self, ability_type):
-        if ability_type == 'heal':
-            return pygame.image.load(path.join('images', 'ability', 'heal.png')).convert_alpha()
-        elif ability_type == 'speed':
-            return pygame.image.load(path.join('images', 'ability', 'speed.png')).convert_alpha()
-        elif ability_type == 'invincibility':
-            return pygame.image.load(path.join('images', 'ability', 'kebal.png')).convert_alpha()
-        else:
+        if ability_type not in ABILITY_IMAGES:
             raise ValueError("Unknown ability type")
+        return load_image(path.join('images', 'ability', ABILITY_IMAGES[ability_type]))
 
     def update(self, dt):
-        self.rect.y = self.original_y + self.amplitude * math.sin(pygame.time.get_ticks() * 0.005 * self.animation_speed) 
\ No newline at end of file
+        self.rect.y = self.original_y + self.amplitude * math.sin(get_ticks() * 0.005 * self.animation_speed) 
\ No newline at end of file
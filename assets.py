@@ -0,0 +1,44 @@
+import pygame
+from os import walk
+from os.path import join, dirname, basename
+
+atlas = {}
+images = {}
+folders = {}
+fonts = {}
+sounds = {}
+
+def load_image(path, scale = None):
+    key = (path, scale)
+    if key not in images:
+        if scale:
+            images[key] = pygame.transform.scale(load_image(path), scale)
+        else:
+            images[key] = atlas[path] if path in atlas else pygame.image.load(path).convert_alpha()
+    return images[key]
+
+def add_atlas(sprites):
+    atlas.update(sprites)
+
+def list_folders(path):
+    names = {basename(dirname(file)) for file in atlas if dirname(dirname(file)) == path}
+    return sorted(names) if names else sorted(next(walk(path))[1])
+
+def load_folder(path):
+    if path not in folders:
+        file_names = [basename(file) for file in atlas if dirname(file) == path] or next(walk(path))[2]
+        folders[path] = [load_image(join(path, file_name)) for file_name in sorted(file_names, key = lambda name: int(name.split('.')[0]))]
+    return folders[path]
+
+def load_font(path, size):
+    key = (path, size)
+    if key not in fonts:
+        fonts[key] = pygame.font.Font(path, size)
+    return fonts[key]
+
+def load_sound(path, volume = None):
+    if path not in sounds:
+        sounds[path] = pygame.mixer.Sound(path)
+        if volume is not None:
+            sounds[path].set_volume(volume)
+    return sounds[path]
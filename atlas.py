@@ -0,0 +1,82 @@
+from settings import *
+from os import makedirs, path, replace, getpid
+import json
+
+ATLAS_DIR = join('data', 'cache')
+ATLAS_IMAGE_PATH = join(ATLAS_DIR, 'sprites.rgba')
+ATLAS_INDEX_PATH = join(ATLAS_DIR, 'sprites.json')
+ATLAS_SOURCES = [join('images', 'player'), join('images', 'enemies'), join('images', 'gun'), join('images', 'ability')]
+ATLAS_WIDTH = 1024
+
+def pack_surfaces(surfaces, width):
+    rects, x, y, shelf_height = [None] * len(surfaces), 0, 0, 0
+    for index in sorted(range(len(surfaces)), key = lambda index: -surfaces[index].get_height()):
+        surf_width, surf_height = surfaces[index].get_size()
+        if x + surf_width > width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        rects[index] = pygame.Rect(x, y, surf_width, surf_height)
+        x += surf_width
+        shelf_height = max(shelf_height, surf_height)
+
+    atlas = pygame.Surface((width, max(1, y + shelf_height)), pygame.SRCALPHA)
+    for surf, rect in zip(surfaces, rects):
+        atlas.blit(surf, rect, special_flags = pygame.BLEND_RGBA_MAX)
+    return atlas, rects
+
+def source_files(roots = ATLAS_SOURCES):
+    for root in roots:
+        for folder, _, file_names in sorted(walk(root)):
+            for file_name in sorted(file_names):
+                if file_name.endswith('.png'):
+                    yield join(folder, file_name)
+
+def build_atlas(roots = ATLAS_SOURCES):
+    files = list(source_files(roots))
+    atlas, rects = pack_surfaces([pygame.image.load(file).convert_alpha() for file in files], ATLAS_WIDTH)
+
+    makedirs(ATLAS_DIR, exist_ok = True)
+    image_temp, index_temp = f'{ATLAS_IMAGE_PATH}.{getpid()}.tmp', f'{ATLAS_INDEX_PATH}.{getpid()}.tmp'
+    with open(image_temp, 'wb') as file:
+        file.write(pygame.image.tobytes(atlas, 'RGBA'))
+    index = {
+        'size': atlas.get_size(),
+        'sprites': {file: {'rect': tuple(rect), 'mtime': path.getmtime(file)} for file, rect in zip(files, rects)}
+    }
+    with open(index_temp, 'w') as file:
+        json.dump(index, file, indent = 1)
+    replace(image_temp, ATLAS_IMAGE_PATH)
+    replace(index_temp, ATLAS_INDEX_PATH)
+    return ATLAS_IMAGE_PATH
+
+def read_atlas(roots = ATLAS_SOURCES):
+    if not path.exists(ATLAS_INDEX_PATH) or not path.exists(ATLAS_IMAGE_PATH):
+        return None
+    try:
+        with open(ATLAS_INDEX_PATH) as file:
+            index = json.load(file)
+        size, sprites = tuple(index['size']), index['sprites']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    files = list(source_files(roots))
+    if sorted(files) != sorted(sprites) or any(path.getmtime(file) != sprites[file]['mtime'] for file in files):
+        return None
+
+    with open(ATLAS_IMAGE_PATH, 'rb') as file:
+        data = file.read()
+    if len(data) != size[0] * size[1] * 4:
+        return None
+    sheet = pygame.image.frombuffer(data, size, 'RGBA').convert_alpha()
+    return {file: sheet.subsurface(entry['rect']) for file, entry in sprites.items()}
+
+def load_atlas(roots = ATLAS_SOURCES):
+    sprites = read_atlas(roots)
+    if sprites is None:
+        build_atlas(roots)
+        sprites = read_atlas(roots)
+    return sprites
+
+if __name__ == '__main__':
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    print(f'{len(list(source_files()))} images -> {build_atlas()}')
@@ -0,0 +1,125 @@
+from os import environ
+environ['SDL_VIDEODRIVER'] = 'dummy'
+environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import sys
+import json
+import subprocess
+from math import cos, sin, tau
+from random import Random
+from time import perf_counter
+from statistics import mean, median
+from main import Game
+from controls import ScriptedControls
+from timing import simulation_clock
+from settings import *
+
+ENEMY_COUNTS = (0, 50, 100, 200, 400, 800)
+BULLET_COUNTS = (0, 20, 100)
+FRAMES = 120
+SEED = 1
+
+class Benchmark:
+    def __init__(self, game, seed = SEED):
+        self.game = game
+        self.random = Random(seed)
+        self.dt = 1 / TICK_RATE
+
+        self.phases = {
+            'all_sprites.draw': lambda: game.all_sprites.draw(game.player.rect.center),
+            'all_sprites.update': lambda: game.all_sprites.update(self.dt),
+            'bullet_collision': game.bullet_collision,
+            'player_collision': game.player_collision,
+            'spawn_ability': game.spawn_ability,
+            'draw_health_bar': game.draw_health_bar,
+            'draw_active_abilities': game.draw_active_abilities,
+            'draw_score_and_time': game.draw_score_and_time,
+            'draw_wave': game.draw_wave
+        }
+
+    def spawn_tiles(self):
+        field = self.game.flow_field
+        center_x, center_y = field.tile_at(self.game.player.rect.center)
+        radius_x, radius_y = WINDOW_WIDTH // TILE_SIZE, WINDOW_HEIGHT // TILE_SIZE
+        return [field.tile_center(x, y)
+            for y in range(center_y - radius_y, center_y + radius_y + 1)
+            for x in range(center_x - radius_x, center_x + radius_x + 1)
+            if field.in_bounds(x, y) and field.is_walkable(x, y) and (abs(x - center_x) > 2 or abs(y - center_y) > 2)]
+
+    def populate(self, enemies, bullets, tiles):
+        game = self.game
+        frames = list(game.enemy_frames.values())
+        while len(game.enemy_sprites) < enemies:
+            game.enemy_pool.acquire(self.random.choice(tiles), self.random.choice(frames), (game.all_sprites, game.enemy_sprites), game.player, game.collision_sprites, game.enemy_speed, game.flow_field)
+        while len(game.bullet_sprites) < bullets:
+            angle = self.random.random() * tau
+            direction = pygame.Vector2(cos(angle), sin(angle))
+            pos = game.player.rect.center + direction * self.random.uniform(50, WINDOW_WIDTH / 2)
+            game.bullet_pool.acquire(game.bullet_surf, pos, direction, (game.all_sprites, game.bullet_sprites))
+
+    def clear_abilities(self):
+        for ability in self.game.ability_sprites.sprites():
+            ability.kill()
+        self.game.free_drops[:] = self.game.ability_drop
+
+    def measure(self, enemies, bullets):
+        game = self.game
+        game.reset()
+        game.game_started = True
+        game.flow_field.update(game.player.hitbox_rect.center)
+        game.player.activate_invincibility(FRAMES * self.dt + 1)
+        tiles = self.spawn_tiles()
+
+        samples = {name: [] for name in self.phases}
+        for _ in range(FRAMES):
+            simulation_clock.advance(self.dt)
+            self.populate(enemies, bullets, tiles)
+            self.clear_abilities()
+            for name, phase in self.phases.items():
+                start = perf_counter()
+                phase()
+                samples[name].append((perf_counter() - start) * 1000)
+
+        return {
+            'enemies': enemies,
+            'bullets': bullets,
+            'phases': {name: summarize(times) for name, times in samples.items()},
+            'frame': summarize([sum(frame) for frame in zip(*samples.values())])
+        }
+
+    def sweep(self, enemy_counts = ENEMY_COUNTS, bullet_counts = BULLET_COUNTS):
+        results = []
+        for enemies in enemy_counts:
+            for bullets in bullet_counts:
+                result = self.measure(enemies, bullets)
+                print(f"{enemies:5} enemies {bullets:4} bullets  frame {result['frame']['mean']:7.3f} ms")
+                results.append(result)
+        return results
+
+def summarize(times):
+    ordered = sorted(times)
+    return {
+        'mean': mean(ordered),
+        'median': median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1]
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == '__main__':
+    output_path = sys.argv[1] if len(sys.argv) > 1 else 'benchmark.json'
+    game = Game(headless = True, controls = ScriptedControls([]))
+    report = {
+        'commit': git_commit(),
+        'frames': FRAMES,
+        'tick_rate': TICK_RATE,
+        'results': Benchmark(game).sweep()
+    }
+    with open(output_path, 'w') as file:
+        json.dump(report, file, indent = 4)
+    print(f'Wrote {output_path}')
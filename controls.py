@@ -0,0 +1,132 @@
+from settings import *
+from math import cos, sin, tau
+from random import Random
+
+class KeyboardControls:
+    def update(self):
+        pass
+
+    def movement(self):
+        keys = pygame.key.get_pressed()
+        x = int(keys[pygame.K_RIGHT] or keys[pygame.K_d]) - int(keys[pygame.K_LEFT] or keys[pygame.K_a])
+        y = int(keys[pygame.K_DOWN] or keys[pygame.K_s]) - int(keys[pygame.K_UP] or keys[pygame.K_w])
+        return pygame.Vector2(x, y)
+
+    def aim(self):
+        return pygame.Vector2(pygame.mouse.get_pos()) - pygame.Vector2(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+
+    def shooting(self):
+        return pygame.mouse.get_pressed()[0]
+
+IDLE_STEP = (0, 0, 0, 0, 1, False)
+
+class ScriptedControls:
+    def __init__(self, script, loop = True):
+        self.script = script
+        self.loop = loop
+        self.index = -1
+        self.remaining = 0
+        self.current = IDLE_STEP
+
+    def update(self):
+        if self.remaining <= 0:
+            self.index += 1
+            if self.index >= len(self.script) and self.loop:
+                self.index = 0
+            self.current = self.script[self.index] if self.index < len(self.script) else IDLE_STEP
+            self.remaining = self.current[0]
+        self.remaining -= 1
+
+    def movement(self):
+        return pygame.Vector2(self.current[1], self.current[2])
+
+    def aim(self):
+        return pygame.Vector2(self.current[3], self.current[4])
+
+    def shooting(self):
+        return bool(self.current[5])
+
+class RandomControls:
+    def __init__(self, seed = None, hold_ticks = 30, shoot_chance = 0.5):
+        self.random = Random(seed)
+        self.hold_ticks = hold_ticks
+        self.shoot_chance = shoot_chance
+        self.remaining = 0
+        self.direction = pygame.Vector2()
+        self.aim_direction = pygame.Vector2(0, 1)
+        self.firing = False
+
+    def update(self):
+        if self.remaining <= 0:
+            self.remaining = self.hold_ticks
+            self.direction = pygame.Vector2(self.random.randint(-1, 1), self.random.randint(-1, 1))
+            angle = self.random.random() * tau
+            self.aim_direction = pygame.Vector2(cos(angle), sin(angle))
+            self.firing = self.random.random() < self.shoot_chance
+        self.remaining -= 1
+
+    def movement(self):
+        return pygame.Vector2(self.direction)
+
+    def aim(self):
+        return pygame.Vector2(self.aim_direction)
+
+    def shooting(self):
+        return self.firing
+
+class BotControls:
+    def __init__(self, seed = None, flee_distance = 250, shoot_distance = 600, hold_ticks = 30):
+        self.random = Random(seed)
+        self.flee_distance = flee_distance
+        self.shoot_distance = shoot_distance
+        self.hold_ticks = hold_ticks
+        self.game = None
+        self.remaining = 0
+        self.wander = pygame.Vector2()
+        self.direction = pygame.Vector2()
+        self.aim_direction = pygame.Vector2(0, 1)
+        self.firing = False
+
+    def attach(self, game):
+        self.game = game
+
+    def enemy_positions(self):
+        positions = [enemy.hitbox_rect.center for enemy in self.game.enemy_sprites if not enemy.death_time]
+        horde = self.game.horde
+        if horde:
+            alive = horde.active & (horde.death_time == 0)
+            positions.extend(map(tuple, horde.position[alive]))
+        return positions
+
+    def update(self):
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.remaining = self.hold_ticks
+            self.wander = pygame.Vector2(self.random.randint(-1, 1), self.random.randint(-1, 1))
+
+        player_pos = pygame.Vector2(self.game.player.hitbox_rect.center)
+        nearest = min(self.enemy_positions(), key = lambda pos: player_pos.distance_squared_to(pos), default = None)
+        self.direction = self.wander
+        self.firing = False
+        if nearest is None:
+            return
+
+        offset = pygame.Vector2(nearest) - player_pos
+        distance = offset.length()
+        if distance > 0:
+            self.aim_direction = offset
+        self.firing = distance < self.shoot_distance
+        if distance < self.flee_distance:
+            self.direction = -offset
+        elif self.game.ability_sprites:
+            ability = min(self.game.ability_sprites, key = lambda sprite: player_pos.distance_squared_to(sprite.rect.center))
+            self.direction = pygame.Vector2(ability.rect.center) - player_pos
+
+    def movement(self):
+        return pygame.Vector2(self.direction)
+
+    def aim(self):
+        return pygame.Vector2(self.aim_direction)
+
+    def shooting(self):
+        return self.firing
@@ -1,18 +1,172 @@
 from settings import * 
+from heapq import merge
 
 class AllSprites(pygame.sprite.Group):
     def __init__(self):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
         self.offset = pygame.Vector2()
+        self.view_rect = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.ground_chunks = {}
+        self.chunk_pixels = CHUNK_SIZE * TILE_SIZE
+
+        self.static_chunks = {}
+        self.depth_order = []
+        self.depth_members = set()
+        self.depth_removed = False
+        self.previous_positions = {}
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        if hasattr(sprite, 'static'):
+            for chunk_pos in self.chunks_in(sprite.rect):
+                self.static_chunks.setdefault(chunk_pos, []).append(sprite)
+        elif sprite not in self.depth_members:
+            self.depth_order.append(sprite)
+            self.depth_members.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if hasattr(sprite, 'static'):
+            for chunk_pos in self.chunks_in(sprite.rect):
+                self.static_chunks[chunk_pos].remove(sprite)
+        else:
+            self.depth_removed = True
+
+    def prune_depth(self):
+        if self.depth_removed:
+            self.depth_removed = False
+            self.depth_order = [sprite for sprite in self.depth_order if sprite in self.spritedict]
+            self.depth_members.intersection_update(self.spritedict)
+
+    def update(self, *args):
+        self.prune_depth()
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.depth_order if not hasattr(sprite, 'snap')}
+        super().update(*args)
+
+    def interpolated_rect(self, sprite, alpha):
+        previous = self.previous_positions.get(sprite)
+        if previous is None or alpha >= 1:
+            return sprite.rect
+        x = previous[0] + (sprite.rect.x - previous[0]) * alpha
+        y = previous[1] + (sprite.rect.y - previous[1]) * alpha
+        return pygame.Rect(round(x), round(y), sprite.rect.width, sprite.rect.height)
+
+    def chunks_in(self, rect):
+        for chunk_y in range(rect.top // self.chunk_pixels, (rect.bottom - 1) // self.chunk_pixels + 1):
+            for chunk_x in range(rect.left // self.chunk_pixels, (rect.right - 1) // self.chunk_pixels + 1):
+                yield chunk_x, chunk_y
+
+    def bake_ground(self, tiles):
+        for x, y, image in tiles:
+            chunk_pos = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+            if chunk_pos not in self.ground_chunks:
+                self.ground_chunks[chunk_pos] = pygame.Surface((self.chunk_pixels, self.chunk_pixels), pygame.SRCALPHA).convert_alpha()
+            self.ground_chunks[chunk_pos].blit(image, ((x % CHUNK_SIZE) * TILE_SIZE, (y % CHUNK_SIZE) * TILE_SIZE))
+
+    def sort_depth(self):
+        self.prune_depth()
+        order = self.depth_order
+        keys = [sprite.rect.centery for sprite in order]
+
+        for i in range(1, len(order)):
+            key = keys[i]
+            if key >= keys[i - 1]:
+                continue
+            sprite, j = order[i], i - 1
+            while j >= 0 and keys[j] > key:
+                order[j + 1], keys[j + 1] = order[j], keys[j]
+                j -= 1
+            order[j + 1], keys[j + 1] = sprite, key
+
+        self.depth_order = order
+
+    def visible_static(self):
+        visible = set()
+        for chunk_pos in self.chunks_in(self.view_rect):
+            for sprite in self.static_chunks.get(chunk_pos, ()):
+                if self.view_rect.colliderect(sprite.rect):
+                    visible.add(sprite)
+        return sorted(visible, key = lambda sprite: sprite.rect.centery)
+
+    def visible_dynamic(self):
+        return [sprite for sprite in self.depth_order if self.view_rect.colliderect(sprite.rect)]
+
+    def draw_ground(self):
+        for chunk_x, chunk_y in self.chunks_in(self.view_rect):
+            chunk = self.ground_chunks.get((chunk_x, chunk_y))
+            if chunk:
+                self.display_surface.blit(chunk, (chunk_x * self.chunk_pixels + self.offset.x, chunk_y * self.chunk_pixels + self.offset.y))
     
-    def draw(self, target_pos):
+    def draw(self, target_pos, alpha = 1):
         self.offset.x = -(target_pos[0] - WINDOW_WIDTH / 2)
         self.offset.y = -(target_pos[1] - WINDOW_HEIGHT / 2)
+        self.view_rect.topleft = (-self.offset.x, -self.offset.y)
+
+        self.draw_ground()
+        self.sort_depth()
+        for sprite in merge(self.visible_static(), self.visible_dynamic(), key = lambda sprite: sprite.rect.centery):
+            self.display_surface.blit(sprite.image, self.interpolated_rect(sprite, alpha).topleft + self.offset)
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+
+    def cells_in(self, rect):
+        for cell_y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+            for cell_x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+                yield cell_x, cell_y
+
+    def insert(self, item, rect):
+        self.order.setdefault(item, len(self.order))
+        for cell in self.cells_in(rect):
+            self.cells.setdefault(cell, []).append(item)
+
+    def remove(self, item, rect):
+        for cell in self.cells_in(rect):
+            self.cells[cell].remove(item)
+
+    def clear(self):
+        self.cells.clear()
+        self.order.clear()
+
+    def query(self, rect):
+        found = set()
+        for cell in self.cells_in(rect):
+            found.update(self.cells.get(cell, ()))
+        return sorted(found, key = self.order.__getitem__)
+
+class CollisionGrid(pygame.sprite.Group):
+    def __init__(self):
+        super().__init__()
+        self.grid = SpatialHash(GRID_CELL_SIZE)
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.grid.insert(sprite, sprite.rect)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.grid.remove(sprite, sprite.rect)
+
+    def query(self, rect):
+        return self.grid.query(rect)
+
+class SpritePool:
+    def __init__(self, sprite_type):
+        self.sprite_type = sprite_type
+        self.free = []
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+        else:
+            sprite = self.sprite_type(*args)
+            sprite.pool = self
+        return sprite
 
-        ground_sprites = [sprite for sprite in self if hasattr(sprite, 'ground')] 
-        object_sprites = [sprite for sprite in self if not hasattr(sprite, 'ground')] 
-        
-        for layer in [ground_sprites, object_sprites]:
-            for sprite in sorted(layer, key = lambda sprite: sprite.rect.centery):
-                self.display_surface.blit(sprite.image, sprite.rect.topleft + self.offset)
\ No newline at end of file
+    def release(self, sprite):
+        self.free.append(sprite)
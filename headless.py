@@ -0,0 +1,23 @@
+from os import environ
+environ['SDL_VIDEODRIVER'] = 'dummy'
+environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import sys
+import json
+from main import Game
+from controls import RandomControls, ScriptedControls
+
+def run(duration, controls, seed = None):
+    game = Game(headless = True, controls = controls, seed = seed)
+    return game.run_headless(duration)
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    seed = None
+    if len(sys.argv) > 2 and sys.argv[2].endswith('.json'):
+        with open(sys.argv[2]) as file:
+            controls = ScriptedControls(json.load(file))
+    else:
+        seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        controls = RandomControls(seed)
+    print(json.dumps(run(duration, controls, seed), indent = 4))
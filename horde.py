@@ -0,0 +1,140 @@
+from settings import *
+from sprites import get_silhouette
+from timing import get_ticks
+import numpy as np
+
+class EnemyView(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.snap = True
+
+class EnemyHorde:
+    def __init__(self, frames, player, flow_field, view_groups, capacity = 256):
+        self.frames = frames
+        self.death_frames = [get_silhouette(kind_frames[0]) for kind_frames in frames]
+
+        self.player = player
+        self.flow_field = flow_field
+        self.flow_version = None
+        self.view_groups = view_groups
+        self.views = []
+
+        self.hitbox_size = np.array(frames[0][0].get_rect().inflate(-20, -40).size, dtype = float)
+        self.animation_speed = 6
+        self.death_duration = 400
+
+        self.position = np.zeros((capacity, 2))
+        self.previous_position = np.zeros((capacity, 2))
+        self.speed = np.zeros(capacity)
+        self.frame_index = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype = int)
+        self.death_time = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype = bool)
+
+    def count(self):
+        return int(self.active.sum())
+
+    def grow(self):
+        capacity = len(self.active)
+        for name in ('position', 'previous_position', 'speed', 'frame_index', 'kind', 'death_time', 'active'):
+            array = getattr(self, name)
+            grown = np.zeros((capacity * 2,) + array.shape[1:], dtype = array.dtype)
+            grown[:capacity] = array
+            setattr(self, name, grown)
+
+    def spawn(self, pos, kind, speed):
+        free = np.flatnonzero(~self.active)
+        if not len(free):
+            self.grow()
+            free = np.flatnonzero(~self.active)
+        index = free[0]
+        self.position[index] = pos
+        self.previous_position[index] = pos
+        self.speed[index] = speed
+        self.frame_index[index] = 0
+        self.kind[index] = kind
+        self.death_time[index] = 0
+        self.active[index] = True
+        return index
+
+    def flow_targets(self):
+        if self.flow_version != self.flow_field.version:
+            self.flow_version = self.flow_field.version
+            self.next_tiles = np.array([tile if tile else (np.nan, np.nan) for tile in self.flow_field.next_tiles], dtype = float)
+            self.walkable = np.array(self.flow_field.walkable, dtype = bool)
+        return self.next_tiles
+
+    def tile_indices(self, position):
+        tiles = (position // TILE_SIZE).astype(int)
+        tiles[:, 0] = tiles[:, 0].clip(0, self.flow_field.width - 1)
+        tiles[:, 1] = tiles[:, 1].clip(0, self.flow_field.height - 1)
+        return tiles[:, 1] * self.flow_field.width + tiles[:, 0]
+
+    def update(self, dt):
+        current_time = get_ticks()
+        self.previous_position[:] = self.position
+        dying = self.active & (self.death_time > 0)
+        self.active[dying & (current_time - self.death_time >= self.death_duration)] = False
+
+        moving = np.flatnonzero(self.active & (self.death_time == 0))
+        if not len(moving):
+            return
+
+        position = self.position[moving]
+        tiles = self.tile_indices(position)
+        targets = self.flow_targets()[tiles]
+        no_flow = np.isnan(targets[:, 0])
+        targets[no_flow] = self.player.rect.center
+
+        direction = targets - position
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        length[length == 0] = 1
+        step = direction / length[:, None] * (self.speed[moving] * dt)[:, None]
+
+        for axis in (0, 1):
+            moved = position.copy()
+            moved[:, axis] += step[:, axis]
+            new_tiles = self.tile_indices(moved)
+            blocked = ~self.walkable[new_tiles] & self.walkable[tiles] & (new_tiles != tiles)
+            position[~blocked, axis] = moved[~blocked, axis]
+            tiles = self.tile_indices(position)
+
+        self.position[moving] = position
+        self.frame_index[moving] += self.animation_speed * dt
+
+    def overlapping(self, rect):
+        half = self.hitbox_size / 2
+        alive = self.active & (self.death_time == 0)
+        left, top = self.position[:, 0] - half[0], self.position[:, 1] - half[1]
+        hits = alive & (left < rect.right) & (left + self.hitbox_size[0] > rect.left) & (top < rect.bottom) & (top + self.hitbox_size[1] > rect.top)
+        return np.flatnonzero(hits)
+
+    def destroy(self, indices):
+        self.death_time[indices] = get_ticks()
+
+    def sync_views(self, center, alpha = 1):
+        view_rect = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        view_rect.center = center
+        visible = np.flatnonzero(self.active)
+        visible = visible[np.abs(self.position[visible, 0] - view_rect.centerx) < view_rect.width / 2 + TILE_SIZE * 2]
+        visible = visible[np.abs(self.position[visible, 1] - view_rect.centery) < view_rect.height / 2 + TILE_SIZE * 2]
+
+        while len(self.views) < len(visible):
+            self.views.append(EnemyView())
+
+        position = self.previous_position + (self.position - self.previous_position) * alpha
+        for view, index in zip(self.views, visible):
+            kind_frames = self.frames[self.kind[index]]
+            if self.death_time[index]:
+                view.image = self.death_frames[self.kind[index]]
+            else:
+                view.image = kind_frames[int(self.frame_index[index]) % len(kind_frames)]
+            view.rect = view.image.get_rect(center = (int(position[index, 0]), int(position[index, 1])))
+            if not view.alive():
+                view.add(self.view_groups)
+
+        for view in self.views[len(visible):]:
+            if view.alive():
+                view.kill()
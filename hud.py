@@ -0,0 +1,120 @@
+from settings import *
+from assets import load_font, load_image
+from ability import ABILITY_IMAGES
+
+class Hud:
+    def __init__(self):
+        self.font = load_font(join('fonts', 'upheavtt.ttf'), FONT_SIZE)
+        self.time_font = load_font(join('fonts', 'Mario-Kart-DS.ttf'), 24)
+        self.boost_font = load_font(join('fonts', 'Mario-Kart-DS.ttf'), 30)
+
+        self.heart_icon = load_image(join('menu', 'heart.png'), (50, 50))
+        self.clock_icon = load_image(join('menu', 'clock.png'), (30, 30))
+        self.star_icon = load_image(join('menu', 'star.png'), (45, 45))
+        self.ability_icons = {ability: load_image(join('images', 'ability', file_name), (30, 30)) for ability, file_name in ABILITY_IMAGES.items()}
+
+        self.text_cache = {}
+        self.panels = {}
+        self.heal_key = None
+        self.heal_surface = None
+
+    def text(self, font, text, color):
+        key = (font, text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= HUD_TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            surface = self.text_cache[key] = font.render(text, True, color)
+        return surface
+
+    def compose(self, operations):
+        if not operations:
+            return None
+        rects = [pygame.Rect(target, source.get_size()) if kind == 'blit' else pygame.Rect(target) for kind, source, target in operations]
+        bounds = rects[0].unionall(rects[1:])
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for (kind, source, _), rect in zip(operations, rects):
+            rect = rect.move(-bounds.x, -bounds.y)
+            if kind == 'blit':
+                surface.blit(source, rect)
+            else:
+                pygame.draw.rect(surface, source, rect)
+        return surface, bounds.topleft
+
+    def draw_panel(self, surface, name, key, operations):
+        cached = self.panels.get(name)
+        if cached is None or cached[0] != key:
+            cached = self.panels[name] = (key, self.compose(operations()))
+        if cached[1]:
+            surface.blit(*cached[1])
+
+    def draw_health(self, surface, health_ratio, heal_text, heal_opacity):
+        def operations():
+            corner_size = 5
+            corners = [(HEALTH_X - 2, HEALTH_Y - 2), (HEALTH_X + HEALTH_WIDTH, HEALTH_Y - 2), (HEALTH_X - 2, HEALTH_Y + HEALTH_HEIGHT), (HEALTH_X + HEALTH_WIDTH, HEALTH_Y + HEALTH_HEIGHT)]
+            return [('rect', (0, 0, 0), (HEALTH_X - 2, HEALTH_Y - 2, HEALTH_WIDTH + 4, HEALTH_HEIGHT + 4))] + \
+                [('rect', (0, 0, 0), (corner_x, corner_y, corner_size, corner_size)) for corner_x, corner_y in corners] + [
+                ('rect', (255, 0, 0), (HEALTH_X, HEALTH_Y, HEALTH_WIDTH, HEALTH_HEIGHT)),
+                ('rect', (0, 255, 0), (HEALTH_X, HEALTH_Y, HEALTH_WIDTH * health_ratio, HEALTH_HEIGHT)),
+                ('blit', self.heart_icon, (HEALTH_X - 20, HEALTH_Y - 15))
+            ]
+        self.draw_panel(surface, 'health', health_ratio, operations)
+
+        if heal_text:
+            heal_key = (heal_text, int(heal_opacity))
+            if heal_key != self.heal_key:
+                self.heal_key = heal_key
+                self.heal_surface = self.text(self.time_font, heal_text, (255, 255, 255)).copy()
+                self.heal_surface.set_alpha(int(heal_opacity))
+            surface.blit(self.heal_surface, (HEALTH_X + HEALTH_WIDTH + 10, HEALTH_Y))
+
+    def draw_abilities(self, surface, abilities):
+        def operations():
+            result = []
+            y_offset = HEALTH_Y + HEALTH_HEIGHT + 30
+            for ability, remaining_time in abilities:
+                if ability in self.ability_icons:
+                    result.append(('blit', self.ability_icons[ability], (HEALTH_X, y_offset)))
+                result.append(('blit', self.text(self.boost_font, remaining_time, (255, 255, 255)), (HEALTH_X + 38, y_offset + 2)))
+                result.append(('blit', self.text(self.boost_font, remaining_time, (0, 0, 0)), (HEALTH_X + 38, y_offset)))
+                y_offset += 40
+            return result
+        self.draw_panel(surface, 'abilities', tuple(abilities), operations)
+
+    def draw_score(self, surface, score):
+        def operations():
+            return [
+                ('blit', self.star_icon, (WINDOW_WIDTH - 255, 40)),
+                ('blit', self.text(self.font, f'Score {score}', (255, 255, 255)), (WINDOW_WIDTH - 200, 50)),
+                ('blit', self.text(self.font, f'Score {score}', (0, 0, 0)), (WINDOW_WIDTH - 202, 48))
+            ]
+        self.draw_panel(surface, 'score', score, operations)
+
+    def draw_time(self, surface, time_text, running):
+        def operations():
+            result = []
+            if running:
+                result.append(('blit', self.clock_icon, (WINDOW_WIDTH // 2 - 45, 84)))
+                result.append(('blit', self.text(self.time_font, time_text, (255, 255, 255)), (WINDOW_WIDTH // 2 - 12, 90)))
+            result.append(('blit', self.text(self.time_font, time_text, (0, 0, 0)), (WINDOW_WIDTH // 2 - 10, 88)))
+            return result
+        self.draw_panel(surface, 'time', (time_text, running), operations)
+
+    def draw_wave(self, surface, wave):
+        def operations():
+            return [
+                ('blit', self.text(self.font, f'Wave {wave}', (255, 255, 255)), (WINDOW_WIDTH // 2 - 50, 48)),
+                ('blit', self.text(self.font, f'Wave {wave}', (0, 0, 0)), (WINDOW_WIDTH // 2 - 48, 48))
+            ]
+        self.draw_panel(surface, 'wave', wave, operations)
+
+    def draw_boss_health(self, surface, health, max_health):
+        def operations():
+            health_surface = self.text(self.time_font, f'Boss Health: {health}/{max_health}', (255, 255, 255))
+            return [
+                ('rect', (0, 0, 0), (WINDOW_WIDTH / 2 - 200, 100, 404, 34)),
+                ('rect', (255, 0, 0), (WINDOW_WIDTH / 2 - 200, 100, 400, 30)),
+                ('rect', (0, 255, 0), (WINDOW_WIDTH / 2 - 200, 100, 400 * health / max_health, 30)),
+                ('blit', health_surface, (WINDOW_WIDTH / 2 - health_surface.get_width() / 2, 70))
+            ]
+        self.draw_panel(surface, 'boss', (health, max_health), operations)
@@ -1,255 +1,276 @@
+from time import perf_counter
+launch_time = perf_counter()
+
 import pygame
-import numpy as np
-from moviepy.editor import VideoFileClip
 from settings import *
 from player import Player
 from ability import Ability
+from assets import load_image, load_folder, list_folders, add_atlas, load_font, load_sound
+from atlas import load_atlas
 from sprites import *
-from pytmx.util_pygame import load_pygame
-from groups import AllSprites
-from random import choice
+from groups import AllSprites, CollisionGrid, SpatialHash, SpritePool
+from pathfinding import FlowField
+from horde import EnemyHorde
+from video import VideoPlayer
+from mapcache import load_map
+from timing import simulation_clock, scheduler, get_ticks
+from controls import KeyboardControls, ScriptedControls
+from recording import Recorder, read_recording
+from profiler import Profiler
+from hud import Hud
+from screens import DirtyScreen
+from random import Random, randrange
+from math import ceil
+from threading import Thread
+import sys
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless = False, controls = None, params = None, seed = None):
+        self.headless = headless
+        self.controls = controls or KeyboardControls()
+        self.params = {**GAME_PARAMS, **(params or {})}
+        self.seed = seed
+        self.random = Random()
+        self.recorder = None
+        self.horde = None
         pygame.init()
         self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption('Jason Hunter')
         self.clock = pygame.time.Clock()
         self.running = True
+        self.profiler = Profiler()
+        self.screen = DirtyScreen(self.display_surface)
+        self.screen_state = None
+        self.blank_background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
 
         self.all_sprites = AllSprites()
-        self.collision_sprites = pygame.sprite.Group()
+        self.collision_sprites = CollisionGrid()
         self.bullet_sprites = pygame.sprite.Group()
         self.enemy_sprites = pygame.sprite.Group()
+        self.enemy_grid = SpatialHash(GRID_CELL_SIZE)
         self.ability_sprites = pygame.sprite.Group()
+        self.bullet_pool = SpritePool(Bullet)
+        self.enemy_pool = SpritePool(Enemy)
 
-        self.can_shoot = True
-        self.shoot_time = 0 
         self.gun_cooldown = 100
 
-        self.enemy_event = pygame.event.custom_type()
-        pygame.time.set_timer(self.enemy_event, 500)
         self.spawn_positions = []
         self.ability_drop = []
 
-        self.shoot_sound = pygame.mixer.Sound(join('audio', 'shoot.wav'))
-        self.shoot_sound.set_volume(0.2)
-        self.collect_sound = pygame.mixer.Sound(join('audio', 'collect.mp3'))
-        self.collect_sound.set_volume(0.2)
-        self.impact_sound = pygame.mixer.Sound(join('audio', 'impact.ogg'))
-        pygame.mixer.music.load(join('audio', 'music.wav'))
-        pygame.mixer.music.set_volume(0.4)
-
-        self.main_menu_sound = pygame.mixer.Sound(join('audio', 'menu.wav'))  
-        self.game_over_sound = pygame.mixer.Sound(join('audio', 'lose.wav'))  
+        self.main_menu_sound = load_sound(join('audio', 'menu.wav'), 0.4)  
+        self.video = None if headless else VideoPlayer(join('menu', 'background.mp4'), (WINDOW_WIDTH, WINDOW_HEIGHT))
 
-        self.load_images()
-        self.setup()
-
-        self.video_frames = self.play_background_video()
-        self.first_frame = next(self.video_frames)
-        self.frame_surface = pygame.surfarray.make_surface(np.swapaxes(self.first_frame, 0, 1))
-        self.frame_surface = pygame.transform.scale(self.frame_surface, (WINDOW_WIDTH, WINDOW_HEIGHT))
-
-        self.start_button_normal = pygame.transform.scale(pygame.image.load('menu/start.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
-        self.start_button_hover = pygame.transform.scale(pygame.image.load('menu/start_hover.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
+        self.start_button_normal = load_image(join('menu', 'start.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
+        self.start_button_hover = load_image(join('menu', 'start_hover.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
         self.start_button = {
             'image': self.start_button_normal,
             'rect': pygame.Rect(WINDOW_WIDTH / 2 - BUTTON_WIDTH / 2, WINDOW_HEIGHT / 2 + BUTTON_SPACING + 10, BUTTON_WIDTH, BUTTON_HEIGHT)
         }
-        
-        self.game_over_image = pygame.image.load('menu/game_over.png').convert_alpha()
-        self.game_over_image = pygame.transform.scale(self.game_over_image, (WINDOW_WIDTH, WINDOW_HEIGHT))
-        
-        self.play_again_button_normal = pygame.transform.scale(pygame.image.load('menu/play_again.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
-        self.play_again_button_hover = pygame.transform.scale(pygame.image.load('menu/play_again_hover.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
-        self.exit_button_normal = pygame.transform.scale(pygame.image.load('menu/exit.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
-        self.exit_button_hover = pygame.transform.scale(pygame.image.load('menu/exit_hover.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
-
-        self.play_again_button = {
-            'image': self.play_again_button_normal,
-            'rect': pygame.Rect(WINDOW_WIDTH / 2 - BUTTON_WIDTH / 2, WINDOW_HEIGHT / 2 + BUTTON_SPACING, BUTTON_WIDTH, BUTTON_HEIGHT)
-        }
-        self.exit_button = {
-            'image': self.exit_button_normal,
-            'rect': pygame.Rect(WINDOW_WIDTH / 2 - BUTTON_WIDTH / 2, WINDOW_HEIGHT / 2 + BUTTON_SPACING + BUTTON_HEIGHT + 10, BUTTON_WIDTH, BUTTON_HEIGHT)
-        }
+
+        self.heal_text_duration = 1000
+        self.frame_delay = FRAME_DELAY
+        self.countdown_time = 3 
+
+
+        self.game_started = False
+        self.countdown_started = False
+        self.time_to_first_frame = None
+
+        self.load_error = None
+        self.loader = Thread(target = self.load_game, daemon = True)
+        self.loader.start()
+        if headless:
+            self.wait_for_load()
+        else:
+            self.main_menu_sound.play()
+
+    def load_game(self):
+        try:
+            self.shoot_sound = load_sound(join('audio', 'shoot.wav'), 0.2)
+            self.collect_sound = load_sound(join('audio', 'collect.mp3'), 0.2)
+            self.impact_sound = load_sound(join('audio', 'impact.ogg'))
+            self.game_over_sound = load_sound(join('audio', 'lose.wav'))  
+            if not self.headless:
+                pygame.mixer.music.load(join('audio', 'music.wav'))
+                pygame.mixer.music.set_volume(0.4)
+
+            add_atlas(load_atlas())
+            self.load_images()
+            self.setup()
+
+            self.game_over_image = load_image(join('menu', 'game_over.png'), (WINDOW_WIDTH, WINDOW_HEIGHT))
+            
+            self.play_again_button_normal = load_image(join('menu', 'play_again.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
+            self.play_again_button_hover = load_image(join('menu', 'play_again_hover.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
+            self.exit_button_normal = load_image(join('menu', 'exit.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
+            self.exit_button_hover = load_image(join('menu', 'exit_hover.png'), (BUTTON_WIDTH, BUTTON_HEIGHT))
+
+            self.play_again_button = {
+                'image': self.play_again_button_normal,
+                'rect': pygame.Rect(WINDOW_WIDTH / 2 - BUTTON_WIDTH / 2, WINDOW_HEIGHT / 2 + BUTTON_SPACING, BUTTON_WIDTH, BUTTON_HEIGHT)
+            }
+            self.exit_button = {
+                'image': self.exit_button_normal,
+                'rect': pygame.Rect(WINDOW_WIDTH / 2 - BUTTON_WIDTH / 2, WINDOW_HEIGHT / 2 + BUTTON_SPACING + BUTTON_HEIGHT + 10, BUTTON_WIDTH, BUTTON_HEIGHT)
+            }
+
+            self.font = load_font(join('fonts','upheavtt.ttf'), FONT_SIZE) 
+            self.countdown_font = load_font(join('fonts', 'Mario-Kart-DS.ttf'), 72)
+            self.hud = Hud()
+
+            self.reset()
+        except Exception as error:
+            self.load_error = error
+
+    def wait_for_load(self):
+        self.loader.join()
+        if self.load_error:
+            raise self.load_error
+
+    def reset(self):
+        simulation_clock.reset()
+        scheduler.clear()
+        Enemy.spawn_count = 0
+        self.accumulator = 0
+        self.game_seed = self.seed if self.seed is not None else randrange(2 ** 32)
+        self.random.seed(self.game_seed)
+        if self.recorder:
+            self.recorder.clear()
+
+        for sprite in self.all_sprites.sprites():
+            if not hasattr(sprite, 'static'):
+                sprite.kill()
+
+        self.player = Player(self.player_spawn, self.all_sprites, self.collision_sprites, self.controls)
+        self.player.max_health = self.player.current_health = self.params['max_health']
+        self.gun = Gun(self.player, self.all_sprites)
+        self.horde = EnemyHorde(list(self.enemy_frames.values()), self.player, self.flow_field, self.all_sprites) if HORDE_MODE else None
+
+        self.can_shoot = True
+        self.damage_taken = False
+
+        self.start_button['image'] = self.start_button_normal
+        self.play_again_button['image'] = self.play_again_button_normal
+        self.exit_button['image'] = self.exit_button_normal
 
         self.game_started = False
         self.game_over = False  
         self.game_over_sound_played = False  
 
         self.score = 0 
-        self.font = pygame.font.Font(join('fonts','upheavtt.ttf'), FONT_SIZE) 
-        self.countdown_font = pygame.font.Font(join('fonts', 'Mario-Kart-DS.ttf'), 72)
-        self.time_font = pygame.font.Font(join ('fonts', 'Mario-Kart-DS.ttf'), 24)
-        self.boost_font = pygame.font.Font(join ('fonts', 'Mario-Kart-DS.ttf'), 30)
-        
         self.heal_text = None  
         self.heal_text_opacity = 255  
-        self.heal_text_start_time = 0  
-        self.heal_text_duration = 1000
+        self.heal_text_event = None
         
-        self.hit_enemies = set() 
-        self.enemy_speed = ENEMY_SPEED
-        self.spawn_interval = SPAWN_INTERVAL
-        self.last_spawn_time = pygame.time.get_ticks()
-        self.frame_delay = FRAME_DELAY
+        self.enemy_speed = self.params['enemy_speed']
+        self.spawn_interval = self.params['spawn_interval']
+        self.wave_duration = self.params['wave_duration']
+        self.ability_spawn_interval = self.params['ability_delay']
+        self.ability_respawn_delay = self.params['ability_delay']
+        self.last_spawn_time = get_ticks()
         self.start_time = 0 
         self.elapsed_time = 0  
         
-        self.countdown_time = 3 
         self.countdown_started = False
         self.countdown_start_time = 0
         self.countdown_text = ""
 
-        self.heart_icon = pygame.image.load(join('menu', 'heart.png')).convert_alpha()
-        self.heart_icon = pygame.transform.scale(self.heart_icon, (50, 50))  
-
-        self.clock_icon = pygame.image.load(join('menu', 'clock.png')).convert_alpha()
-        self.clock_icon = pygame.transform.scale(self.clock_icon, (30, 30))  
-
-        self.star_icon = pygame.image.load(join('menu', 'star.png')).convert_alpha()
-        self.star_icon = pygame.transform.scale(self.star_icon, (45, 45)) 
-        
-        self.ability_icons = {
-            'heal': pygame.image.load(join('images', 'ability', 'heal.png')).convert_alpha(),
-            'speed': pygame.image.load(join('images', 'ability', 'speed.png')).convert_alpha(),
-            'invincibility': pygame.image.load(join('images', 'ability', 'kebal.png')).convert_alpha(),
-        }
-    
-        self.main_menu_sound.play()
-        self.main_menu_sound.set_volume(0.4)
-
-        self.wave_duration = 60 
         self.wave_start_time = 0
         self.current_wave = 1
         self.wave_active = False
         self.boss_active = False
 
-        self.ability_spawn_times = {} 
-        self.ability_spawn_time = 0  
-        self.ability_spawn_interval = ABILITY_DELAY
-        self.ability_respawn_timer = {} 
-        self.ability_respawn_delay = ABILITY_DELAY
+        self.free_drops = list(self.ability_drop)
+        scheduler.repeat(self.ability_spawn_interval * 1000, self.spawn_ability)
         
-    def play_background_video(self):
-        clip = VideoFileClip("menu/background.mp4")
-        fps = clip.fps
-        for frame in clip.iter_frames(fps=fps, dtype='uint8'):
-            yield frame
-            
     def load_images(self):
-        self.bullet_surf = pygame.image.load(join('images', 'gun', 'bullet.png')).convert_alpha()
+        self.bullet_surf = load_image(join('images', 'gun', 'bullet.png'))
+        cache_masks([self.bullet_surf])
 
-        folders = list(walk(join('images', 'enemies')))[0][1]
+        folders = list_folders(join('images', 'enemies'))
         self.enemy_frames = {}
         for folder in folders:
-            for folder_path, _, file_names in walk(join('images', 'enemies', folder)):
-                self.enemy_frames[folder] = []
-                for file_name in sorted(file_names, key=lambda name : int(name.split('.')[0])):
-                    full_path = join(folder_path, file_name)
-                    surf = pygame.image.load(full_path).convert_alpha()
-                    self.enemy_frames[folder].append(surf)
+            self.enemy_frames[folder] = load_folder(join('images', 'enemies', folder))
+            cache_masks(self.enemy_frames[folder])
 
     def input(self):
-        if pygame.mouse.get_pressed()[0] and self.can_shoot and not self.game_over:
+        if self.controls.shooting() and self.can_shoot and not self.game_over:
             self.shoot_sound.play()
             pos = self.gun.rect.center + self.gun.player_direction * 50
-            Bullet(self.bullet_surf, pos, self.gun.player_direction, (self.all_sprites, self.bullet_sprites))
+            self.bullet_pool.acquire(self.bullet_surf, pos, self.gun.player_direction, (self.all_sprites, self.bullet_sprites))
             self.can_shoot = False
-            self.shoot_time = pygame.time.get_ticks()
+            scheduler.schedule(self.gun_cooldown, self.reload)
 
-    def gun_timer(self):
-        if not self.can_shoot:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.shoot_time >= self.gun_cooldown:
-                self.can_shoot = True
+    def reload(self):
+        self.can_shoot = True
 
     def setup(self):
-        map = load_pygame(join('data', 'maps', 'world2.tmx'))
+        map = load_map(join('data', 'maps', 'world2.tmx'))
 
-        for x, y, image in map.get_layer_by_name('Ground').tiles():
-            Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.all_sprites)
+        self.all_sprites.bake_ground(map.ground_tiles())
         
-        for obj in map.get_layer_by_name('Objects'):
-            CollisionSprite((obj.x, obj.y), obj.image, (self.all_sprites, self.collision_sprites))
+        for x, y, image in map.object_tiles():
+            CollisionSprite((x, y), image, (self.all_sprites, self.collision_sprites))
         
-        for obj in map.get_layer_by_name('Collisions'):
-            CollisionSprite((obj.x, obj.y), pygame.Surface((obj.width, obj.height)), self.collision_sprites)
+        for x, y, width, height in map.collisions:
+            CollisionSprite((x, y), pygame.Surface((width, height)), self.collision_sprites)
+
+        enemy_hitbox = list(self.enemy_frames.values())[0][0].get_rect().inflate(-20, -40)
+        self.flow_field = FlowField(map.width, map.height, [sprite.rect for sprite in self.collision_sprites], enemy_hitbox.size)
             
-        for obj in map.get_layer_by_name('Ability'):
-            if obj.name == 'Drop':
-                self.ability_drop.append((obj.x, obj.y))
-
-        for obj in map.get_layer_by_name('Entities'):
-            if obj.name == 'Player':
-                self.player = Player((obj.x, obj.y), self.all_sprites, self.collision_sprites)
-                self.gun = Gun(self.player, self.all_sprites)
-            else:
-                self.spawn_positions.append((obj.x, obj.y))
+        self.ability_drop.extend(map.drops)
+        self.player_spawn = map.player_spawn
+        self.spawn_positions.extend(map.spawns)
 
     def spawn_ability(self):
-        available_spawn_points = [pos for pos in self.ability_drop if pos not in self.ability_spawn_times]
-        
-        existing_abilities = [ability.rect.topleft for ability in self.ability_sprites]
-
-        available_spawn_points = [pos for pos in available_spawn_points if pos not in existing_abilities]
-
-        if available_spawn_points:
-            spawn_pos = choice(available_spawn_points)
-            ability_type = choice(['heal', 'speed', 'invincibility'])
+        if self.free_drops:
+            spawn_pos = self.free_drops.pop(self.random.randrange(len(self.free_drops)))
+            ability_type = self.random.choice(['heal', 'speed', 'invincibility'])
             new_ability = Ability(spawn_pos, ability_type, self.ability_sprites)
             self.all_sprites.add(new_ability)
-            self.ability_spawn_times[spawn_pos] = pygame.time.get_ticks()  
-        else:
-            for spawn_pos in self.ability_drop:
-                if spawn_pos in self.ability_respawn_timer:
-                    if pygame.time.get_ticks() - self.ability_respawn_timer[spawn_pos] >= self.ability_respawn_delay * 1000:
-                        del self.ability_respawn_timer[spawn_pos]
 
-    def update(self):
-        current_time = pygame.time.get_ticks()
-        
-        if self.heal_text:
-            elapsed_time = current_time - self.heal_text_start_time
-            if elapsed_time < self.heal_text_duration:
-                self.heal_text_opacity = max(0, 255 - (255 * elapsed_time / self.heal_text_duration))  
-            else:
-                self.heal_text = None
-        
-        self.player.active_abilities = [(ability, start_time) for ability, start_time in self.player.active_abilities if (current_time - start_time) < 10000]
-        
-        for spawn_pos in list(self.ability_spawn_times.keys()):
-            if current_time - self.ability_spawn_times[spawn_pos] >= self.ability_spawn_interval * 1000:
-                del self.ability_spawn_times[spawn_pos]  
-                
-        for spawn_pos in self.ability_drop:
-            if spawn_pos not in self.ability_spawn_times and spawn_pos not in self.ability_respawn_timer:
-                self.ability_respawn_timer[spawn_pos] = current_time  
+    def clear_heal_text(self):
+        self.heal_text = None
 
     def bullet_collision(self):
         if self.bullet_sprites:
+            self.enemy_grid.clear()
+            for enemy in self.enemy_sprites:
+                self.enemy_grid.insert(enemy, enemy.rect)
+
             for bullet in self.bullet_sprites:
-                collision_sprites = pygame.sprite.spritecollide(bullet, self.enemy_sprites, False, pygame.sprite.collide_mask)
+                candidates = [enemy for enemy in self.enemy_grid.query(bullet.rect) if enemy.rect.colliderect(bullet.rect)]
+                collision_sprites = [enemy for enemy in candidates if pygame.sprite.collide_mask(bullet, enemy)]
                 if collision_sprites:
                     self.impact_sound.play()
                     for sprite in collision_sprites:
-                        if sprite not in self.hit_enemies:  
+                        if not sprite.death_time:  
                             sprite.destroy()
                             self.score += 1  
-                            self.hit_enemies.add(sprite)  
+                    bullet.kill()
+
+        if self.horde:
+            for bullet in self.bullet_sprites:
+                hit_indices = self.horde.overlapping(bullet.rect)
+                if len(hit_indices):
+                    self.impact_sound.play()
+                    self.horde.destroy(hit_indices)
+                    self.score += len(hit_indices)
                     bullet.kill()
 
     def player_collision(self):
         collided_enemies = pygame.sprite.spritecollide(self.player, self.enemy_sprites, False, pygame.sprite.collide_mask)
+        if self.horde and not collided_enemies:
+            collided_enemies = len(self.horde.overlapping(self.player.hitbox_rect)) > 0
         
         if collided_enemies:
-            if not hasattr(self, 'damage_taken') or not self.damage_taken:
+            if not self.damage_taken:
                 self.player.take_damage(10)
                 self.damage_taken = True  
             if not self.player.is_alive():
                 self.game_over = True  
+                if self.recorder:
+                    self.recorder.save(self)
                 pygame.mixer.music.stop()  
                 if not self.game_over_sound_played:  
                     self.game_over_sound.play()  
@@ -263,101 +284,40 @@ class Game:
             self.collect_ability(ability)
 
     def collect_ability(self, ability):
-        current_time = pygame.time.get_ticks()  
         if ability.ability_type == 'heal':
             self.player.heal(50)
             self.heal_text = "50"  
-            self.heal_text_start_time = current_time  
-            self.heal_text_opacity = 255
+            scheduler.cancel(self.heal_text_event)
+            self.heal_text_event = scheduler.schedule(self.heal_text_duration, self.clear_heal_text)
         elif ability.ability_type == 'speed':
-            if not any(a[0] == 'speed' for a in self.player.active_abilities):
+            if 'speed' not in self.player.active_abilities:
                 self.player.increase_speed(100, 10)
-                self.player.active_abilities.append((ability.ability_type, current_time)) 
         elif ability.ability_type == 'invincibility':
-            if not any(a[0] == 'invincibility' for a in self.player.active_abilities):
+            if 'invincibility' not in self.player.active_abilities:
                 self.player.activate_invincibility(10)
-                self.player.active_abilities.append((ability.ability_type, current_time)) 
 
-        for spawn_pos in self.ability_drop:
-            if spawn_pos in self.ability_spawn_times:
-                del self.ability_spawn_times[spawn_pos]  
-                self.ability_respawn_timer[spawn_pos] = pygame.time.get_ticks()  
+        scheduler.schedule(self.ability_respawn_delay * 1000, self.free_drops.append, ability.spawn_pos)
 
     def draw_health_bar(self):
-        health_ratio = self.player.current_health / self.player.max_health
-        
-        pygame.draw.rect(self.display_surface, (0, 0, 0), (HEALTH_X - 2, HEALTH_Y - 2, HEALTH_WIDTH + 4, HEALTH_HEIGHT + 4))  
-
-        corner_size = 5 
-        for corner_x, corner_y in [(HEALTH_X - 2, HEALTH_Y - 2), (HEALTH_X + HEALTH_WIDTH, HEALTH_Y - 2), (HEALTH_X - 2, HEALTH_Y + HEALTH_HEIGHT), (HEALTH_X + HEALTH_WIDTH, HEALTH_Y + HEALTH_HEIGHT)]:
-            pygame.draw.rect(self.display_surface, (0, 0, 0), (corner_x, corner_y, corner_size, corner_size))
-
-        pygame.draw.rect(self.display_surface, (255, 0, 0), (HEALTH_X, HEALTH_Y, HEALTH_WIDTH, HEALTH_HEIGHT))
-        pygame.draw.rect(self.display_surface, (0, 255, 0), (HEALTH_X, HEALTH_Y, HEALTH_WIDTH * health_ratio, HEALTH_HEIGHT))
-
-        self.display_surface.blit(self.heart_icon, (HEALTH_X - 20, HEALTH_Y - 15)) 
-        
         if self.heal_text:
-            font = pygame.font.Font(join('fonts', 'Mario-Kart-DS.ttf'), 24)  
-            heal_surface = font.render(self.heal_text, True, (255, 255, 255, self.heal_text_opacity))  
-            heal_rect = heal_surface.get_rect(topleft=(HEALTH_X + HEALTH_WIDTH + 10, HEALTH_Y))  
-            heal_surface.set_alpha(self.heal_text_opacity) 
-            self.display_surface.blit(heal_surface, heal_rect)
+            self.heal_text_opacity = 255 * scheduler.remaining(self.heal_text_event) / self.heal_text_duration
+        self.hud.draw_health(self.display_surface, self.player.current_health / self.player.max_health, self.heal_text, self.heal_text_opacity)
         
     def draw_active_abilities(self):
-        y_offset = HEALTH_Y + HEALTH_HEIGHT + 30 
-        current_time = pygame.time.get_ticks()  
-
-        for ability, start_time in self.player.active_abilities:
-            if ability in ['speed', 'invincibility']:
-                remaining_time = max(0, 10 - (current_time - start_time) // 1000)  
-
-                if remaining_time > 0:  
-                    icon = self.ability_icons.get(ability)
-                    if icon:
-                        icon = pygame.transform.scale(icon, (30, 30))  
-                        self.display_surface.blit(icon, (HEALTH_X, y_offset))  
-
-                    formatted_duration = self.format_time(remaining_time)
-
-                    ability_surface = self.boost_font.render(formatted_duration, True, (0, 0, 0))
-                    outline_surface = self.boost_font.render(formatted_duration, True, (255, 255, 255))  
-                    self.display_surface.blit(outline_surface, (HEALTH_X + 38, y_offset + 2))  
-                    self.display_surface.blit(ability_surface, (HEALTH_X + 38, y_offset))  
-
-                    y_offset += 40  
+        abilities = []
+        for ability, event in self.player.active_abilities.items():
+            remaining_time = ceil(scheduler.remaining(event) / 1000)
+            if remaining_time > 0:  
+                abilities.append((ability, self.format_time(remaining_time)))
+        self.hud.draw_abilities(self.display_surface, abilities)
 
     def draw_score_and_time(self):
-        score_surface = self.font.render(f'Score {self.score}', True, (255, 255, 255)) 
-        time_surface = self.time_font.render(self.format_time(self.elapsed_time), True, (255, 255, 255))
-
-        self.display_surface.blit(self.star_icon, (WINDOW_WIDTH - 255, 40)) 
-        self.display_surface.blit(score_surface, (WINDOW_WIDTH - 200, 50))  
-
-        if self.game_started and not self.game_over:
-            self.elapsed_time = int((pygame.time.get_ticks() - self.start_time) / 1000) 
-            self.display_surface.blit(self.clock_icon, (WINDOW_WIDTH // 2 - 45, 84))  
-            self.display_surface.blit(time_surface, (WINDOW_WIDTH // 2 - 12, 90)) 
-
-        outline_color = (0, 0, 0)  
-        outline_surface = self.font.render(f'Score {self.score}', True, outline_color)
-        self.display_surface.blit(outline_surface, (WINDOW_WIDTH - 202, 48))  
-
-        outline_surface_time = self.time_font.render(self.format_time(self.elapsed_time), True, outline_color)
-        self.display_surface.blit(outline_surface_time, (WINDOW_WIDTH // 2 - 10, 88))  
+        self.hud.draw_score(self.display_surface, self.score)
+        self.hud.draw_time(self.display_surface, self.format_time(self.elapsed_time), self.game_started and not self.game_over)
         
     def draw_boss_health_bar(self):
         if self.boss_active:
-            health_ratio = self.boss_health / 1000  
-            
-            pygame.draw.rect(self.display_surface, (0, 0, 0), (WINDOW_WIDTH / 2 - 200, 100, 404, 34))  
-            pygame.draw.rect(self.display_surface, (255, 0, 0), (WINDOW_WIDTH / 2 - 200, 100, 400, 30))  
-            pygame.draw.rect(self.display_surface, (0, 255, 0), (WINDOW_WIDTH / 2 - 200, 100, 400 * health_ratio, 30)) 
-            
-            health_text = f'Boss Health: {self.boss_health}/1000'
-            font = pygame.font.Font(join('fonts', 'Mario-Kart-DS.ttf'), 24)
-            health_surface = font.render(health_text, True, (255, 255, 255))
-            self.display_surface.blit(health_surface, (WINDOW_WIDTH / 2 - health_surface.get_width() / 2, 70))
+            self.hud.draw_boss_health(self.display_surface, self.boss_health, BOSS_HEALTH)
     
     def format_time(self, seconds):
         minutes = seconds // 60
@@ -365,37 +325,53 @@ class Game:
         return f'{minutes:02}.{seconds:02}'
 
     def draw_wave(self):
-        wave_surface = self.font.render(f'Wave {self.current_wave}', True, (0, 0, 0))
-        outline_color = (255, 255, 255)
-        outline_surface = self.font.render(f'Wave {self.current_wave}', True, outline_color)
-        self.display_surface.blit(outline_surface, (WINDOW_WIDTH // 2 - 50, 48))  
-        self.display_surface.blit(wave_surface, (WINDOW_WIDTH // 2 - 48, 48)) 
+        self.hud.draw_wave(self.display_surface, self.current_wave)
         
+    def show_screen(self, state, background):
+        if self.screen_state != state:
+            self.screen_state = state
+            self.screen.show(background)
+
+    def flip_screen(self):
+        rects = self.screen.draw()
+        if self.profiler.overlay:
+            self.draw_profiler()
+            self.screen.invalidate()
+            rects = [self.display_surface.get_rect()]
+        self.profiler.mark('flip')
+        if rects:
+            pygame.display.update(rects)
+
     def draw_countdown(self):
-        countdown_surface = self.countdown_font.render(self.countdown_text, True, (255, 255, 255))
+        self.show_screen('countdown', self.blank_background)
+        countdown_surface = self.hud.text(self.countdown_font, self.countdown_text, (255, 255, 255))
         countdown_rect = countdown_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        self.display_surface.blit(countdown_surface, countdown_rect) 
+        self.screen.set('countdown', countdown_surface, countdown_rect)
 
-    def display_game_over(self):
-        self.display_surface.fill('black')
-        self.display_surface.blit(self.game_over_image, (0, 0))
-        self.display_surface.blit(self.play_again_button['image'], self.play_again_button['rect'])
-        self.display_surface.blit(self.exit_button['image'], self.exit_button['rect'])
+    def game_over_background(self):
+        background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        background.blit(self.game_over_image, (0, 0))
 
         final_score_surface = self.font.render(f'Final Score: {self.score}', True, (255, 255, 255))
         final_score_outline = self.font.render(f'Final Score: {self.score}', True, (0, 0, 0))  
         final_score_rect = final_score_surface.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 50))
 
-        self.display_surface.blit(final_score_outline, (final_score_rect.x + 2, final_score_rect.y + 2))
-        self.display_surface.blit(final_score_surface, final_score_rect)  
+        background.blit(final_score_outline, (final_score_rect.x + 2, final_score_rect.y + 2))
+        background.blit(final_score_surface, final_score_rect)  
 
         final_time_surface = self.font.render(f'Time Survived: {self.format_time(self.elapsed_time)}', True, (255, 255, 255))
         final_time_outline = self.font.render(f'Time Survived: {self.format_time(self.elapsed_time)}', True, (0, 0, 0))  
         final_time_rect = final_time_surface.get_rect(center=(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 20))
 
-        self.display_surface.blit(final_time_outline, (final_time_rect.x + 2, final_time_rect.y + 2))  
-        self.display_surface.blit(final_time_surface, final_time_rect)  
-        pygame.display.update()
+        background.blit(final_time_outline, (final_time_rect.x + 2, final_time_rect.y + 2))  
+        background.blit(final_time_surface, final_time_rect)  
+        return background
+
+    def display_game_over(self):
+        if self.screen_state != 'game_over':
+            self.show_screen('game_over', self.game_over_background())
+        self.screen.set('play_again', self.play_again_button['image'], self.play_again_button['rect'])
+        self.screen.set('exit', self.exit_button['image'], self.exit_button['rect'])
 
     def handle_game_over_input(self):
         mouse_x, mouse_y = pygame.mouse.get_pos()
@@ -414,30 +390,146 @@ class Game:
             self.exit_button['image'] = self.exit_button_normal
 
     def restart_game(self):
-        self.__init__() 
-        self.start_time = pygame.time.get_ticks()  
+        self.reset() 
+        self.start_time = get_ticks()  
         pygame.mixer.music.stop()  
         self.main_menu_sound.play()  
-        self.game_over_sound_played = False  
+
+    def spawn_enemies(self):
+        if get_ticks() - self.last_spawn_time >= self.spawn_interval:
+            if self.horde:
+                for _ in range(HORDE_BATCH):
+                    self.horde.spawn(self.random.choice(self.spawn_positions), self.random.randrange(len(self.enemy_frames)), self.enemy_speed)
+            else:
+                self.enemy_pool.acquire(self.random.choice(self.spawn_positions), self.random.choice(list(self.enemy_frames.values())), (self.all_sprites, self.enemy_sprites), self.player, self.collision_sprites, self.enemy_speed, self.flow_field)
+            self.last_spawn_time = get_ticks()
+
+    def step(self, dt):
+        simulation_clock.advance(dt)
+        self.profiler.mark('timers')
+        scheduler.update()
+
+        self.profiler.mark('input')
+        self.controls.update()
+        if self.recorder and not self.game_over:
+            self.recorder.capture(self.controls)
+        current_time = get_ticks()
+
+        if self.can_shoot:  
+            self.input()
+
+        self.profiler.mark('update')
+        self.spawn_enemies()
+
+        self.flow_field.update(self.player.hitbox_rect.center)
+        self.all_sprites.update(dt)
+        if self.horde:
+            self.horde.update(dt)
+
+        self.profiler.mark('collisions')
+        self.bullet_collision()
+        self.player_collision()
+
+        self.profiler.mark('update')
+        if not self.game_over:
+            self.elapsed_time = int((current_time - self.start_time) / 1000)
+            current_wave_time = (current_time - self.wave_start_time) / 1000
+            if current_wave_time >= self.wave_duration:  
+                self.current_wave += 1  
+                self.wave_start_time = current_time 
+                 
+                self.enemy_speed += self.params['wave_speed_step']
+                self.spawn_interval = max(self.params['min_spawn_interval'], self.spawn_interval - self.params['wave_interval_step'])
+
+    def simulate(self, frame_time):
+        if not FIXED_TIMESTEP:
+            self.step(frame_time)
+            return 1
+
+        tick = 1 / TICK_RATE
+        self.accumulator += min(frame_time, MAX_FRAME_TIME)
+        while self.accumulator >= tick and not self.game_over:
+            self.step(tick)
+            self.accumulator -= tick
+        return self.accumulator / tick
+
+    def run_headless(self, duration):
+        self.game_started = True
+        self.wave_active = True
+        self.start_time = get_ticks()
+        self.wave_start_time = self.start_time
+
+        tick = 1 / TICK_RATE
+        ticks = 0
+        total_ticks = round(duration * TICK_RATE)
+        peak_enemies = peak_bullets = 0
+        start = perf_counter()
+        while ticks < total_ticks and not self.game_over:
+            self.profiler.begin_frame()
+            self.step(tick)
+            ticks += 1
+            peak_enemies = max(peak_enemies, self.enemy_count())
+            peak_bullets = max(peak_bullets, len(self.bullet_sprites))
+        self.profiler.end_frame()
+        wall_time = perf_counter() - start
+
+        return {
+            'ticks': ticks,
+            'sim_time': (get_ticks() - self.start_time) / 1000,
+            'wall_time': wall_time,
+            'ticks_per_second': ticks / wall_time if wall_time else 0,
+            'score': self.score,
+            'wave': self.current_wave,
+            'enemies': self.enemy_count(),
+            'peak_enemies': peak_enemies,
+            'peak_bullets': peak_bullets,
+            'health': self.player.current_health,
+            'game_over': self.game_over,
+            'phases': self.profiler.averages()
+        }
+
+    def enemy_count(self):
+        return len(self.enemy_sprites) + (self.horde.count() if self.horde else 0)
+
+    def sprite_counts(self):
+        return {
+            'all_sprites': len(self.all_sprites),
+            'enemies': self.enemy_count(),
+            'bullets': len(self.bullet_sprites),
+            'abilities': len(self.ability_sprites),
+            'collisions': len(self.collision_sprites)
+        }
+
+    def draw_profiler(self):
+        if self.profiler.overlay:
+            self.profiler.mark('profiler')
+            self.profiler.draw_overlay(self.display_surface, self.clock.get_fps(), {} if self.loader.is_alive() else self.sprite_counts())
 
     def run(self):
         while self.running:
-            dt = self.clock.tick() / 1000
+            self.profiler.begin_frame()
+            self.profiler.mark('wait')
+            dt = self.clock.tick(MAX_FPS if self.game_started and not self.game_over and not self.countdown_started else MENU_FPS) / 1000
 
+            self.profiler.mark('events')
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
-                if event.type == self.enemy_event and self.game_started:
-                    if pygame.time.get_ticks() - self.last_spawn_time >= self.spawn_interval:
-                        Enemy(choice(self.spawn_positions), choice(list(self.enemy_frames.values())), (self.all_sprites, self.enemy_sprites), self.player, self.collision_sprites, self.enemy_speed)
-                        self.last_spawn_time = pygame.time.get_ticks()
+                if event.type == pygame.KEYDOWN:
+                    if event.key == PROFILER_OVERLAY_KEY:
+                        self.profiler.overlay = not self.profiler.overlay
+                    elif event.key == PROFILER_DUMP_KEY:
+                        print(f'Profiler trace written to {self.profiler.dump()}')
+
+            self.profiler.mark('input')
 
             mouse_x, mouse_y = pygame.mouse.get_pos()
             if self.start_button['rect'].collidepoint(mouse_x, mouse_y):
                 self.start_button['image'] = self.start_button_hover
                 if pygame.mouse.get_pressed()[0]: 
                     if not self.game_started:  
-                        self.start_time = pygame.time.get_ticks()
+                        self.wait_for_load()
+                        self.start_time = get_ticks()
                         self.countdown_started = True
                         self.countdown_start_time = pygame.time.get_ticks()
                     self.game_started = True
@@ -450,73 +542,71 @@ class Game:
             if self.countdown_started:
                 current_time = pygame.time.get_ticks()
                 elapsed_time = (current_time - self.countdown_start_time) / 1000  
-                remaining_time = max(0, 3 - int(elapsed_time))  
+                remaining_time = self.countdown_time - int(elapsed_time)
 
-                if remaining_time == 0:
-                    self.countdown_text = "DUARR!!"
-                    pygame.time.delay(1000)  
+                if remaining_time < 0:
                     self.countdown_started = False
                     self.game_started = True  
-                    self.start_time = pygame.time.get_ticks()  
+                    self.start_time = get_ticks()  
                     self.wave_start_time = self.start_time  
                     self.wave_active = True  
+                    self.accumulator = 0
                 else:
-                    self.countdown_text = str(remaining_time)
-
-                self.display_surface.fill('black')  
-                self.draw_countdown()  
-                pygame.display.update()  
-                continue
+                    self.countdown_text = str(remaining_time) if remaining_time else "DUARR!!"
+                    self.profiler.mark('draw')
+                    self.draw_countdown()  
+                    self.flip_screen()
+                    continue
             
             if self.game_started:
-                self.gun_timer()
-                if self.can_shoot:  
-                    self.input()
-                self.all_sprites.update(dt)
-                self.bullet_collision()
-                self.player_collision()
-                self.update()  
-
-                current_time = pygame.time.get_ticks()
-                if current_time - self.ability_spawn_time >= self.ability_spawn_interval * 1000:  
-                    self.spawn_ability()
-                    self.ability_spawn_time = current_time  
-
                 if self.game_over: 
+                    self.profiler.mark('draw')
                     self.display_game_over()  
+                    self.flip_screen()
                     self.handle_game_over_input()  
                 else:
-                    self.all_sprites.draw(self.player.rect.center)  
+                    alpha = self.simulate(dt)
+                    self.profiler.mark('draw')
+                    self.screen_state = 'game'
+                    camera = self.all_sprites.interpolated_rect(self.player, alpha).center
+                    if self.horde:
+                        self.horde.sync_views(camera, alpha)
+                    self.all_sprites.draw(camera, alpha)  
                     self.ability_sprites.draw(self.display_surface)  
+                    self.profiler.mark('hud')
                     self.draw_health_bar()
                     self.draw_active_abilities()
                     self.draw_score_and_time()  
                     self.draw_wave() 
-                    
-                    current_wave_time = (pygame.time.get_ticks() - self.wave_start_time) / 1000
-                    if current_wave_time >= self.wave_duration:  
-                        self.current_wave += 1  
-                        self.wave_start_time = pygame.time.get_ticks() 
-                         
-                        self.enemy_speed += 20
-                        self.spawn_interval = max(100, self.spawn_interval - 50)
-                        
+                    self.draw_profiler()
+                    self.profiler.mark('flip')
                     pygame.display.update()
             else:
-                self.display_surface.fill('black')
-                self.display_surface.blit(self.frame_surface, (0, 0))
-                self.display_surface.blit(self.start_button['image'], self.start_button['rect'])
-                pygame.display.update()
-                
-                try:
-                    self.frame_surface = pygame.surfarray.make_surface(np.swapaxes(next(self.video_frames), 0, 1))
-                    self.frame_surface = pygame.transform.scale(self.frame_surface, (WINDOW_WIDTH, WINDOW_HEIGHT))
-                    pygame.time.delay(int(FRAME_DELAY * 1000))  
-                except StopIteration:
-                    self.video_frames = self.play_background_video()  
-
+                self.profiler.mark('video')
+                self.video.update(dt)
+                self.profiler.mark('draw')
+                if self.screen_state != 'menu':
+                    self.show_screen('menu', self.video.frame_surface)
+                elif self.video.frame_surface is not self.screen.background:
+                    self.screen.set_background(self.video.frame_surface)
+                self.screen.set('start', self.start_button['image'], self.start_button['rect'])
+                self.flip_screen()
+
+                if self.time_to_first_frame is None:
+                    self.time_to_first_frame = perf_counter() - launch_time
+                    print(f'First frame after {self.time_to_first_frame * 1000:.0f} ms')
+
+        if self.recorder and not self.game_over:
+            self.recorder.save(self)
+        self.video.stop()
         pygame.quit()
 
 if __name__ == '__main__':
-    game = Game()
+    if len(sys.argv) > 2 and sys.argv[1] == '--replay':
+        meta, steps = read_recording(sys.argv[2])
+        game = Game(controls = ScriptedControls(steps, loop = False), params = meta['params'], seed = meta['seed'])
+    else:
+        game = Game()
+        if len(sys.argv) > 2 and sys.argv[1] == '--record':
+            game.recorder = Recorder(sys.argv[2])
     game.run()
\ No newline at end of file
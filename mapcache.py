@@ -0,0 +1,160 @@
+from settings import *
+from atlas import pack_surfaces, ATLAS_WIDTH
+from os import makedirs, path, replace, getpid
+import numpy as np
+import json
+import xml.etree.ElementTree as ElementTree
+import struct
+import sys
+
+CACHE_DIR = join('data', 'cache')
+CACHE_HEADER = struct.Struct('<4sdI')
+CACHE_MAGIC = b'JHM1'
+
+class MapData:
+    def __init__(self, width, height, ground, objects, collisions, player_spawn, spawns, drops, images):
+        self.width, self.height = width, height
+        self.ground = ground
+        self.objects = objects
+        self.collisions = collisions
+        self.player_spawn = player_spawn
+        self.spawns = spawns
+        self.drops = drops
+        self.images = images
+
+    def ground_tiles(self):
+        for y, x in zip(*np.nonzero(self.ground >= 0)):
+            yield int(x), int(y), self.images[self.ground[y, x]]
+
+    def object_tiles(self):
+        for x, y, index in self.objects:
+            yield x, y, self.images[int(index)]
+
+def cache_path_for(map_path):
+    return join(CACHE_DIR, path.basename(map_path) + '.bin')
+
+def layer_objects(tmx_map, name):
+    try:
+        return list(tmx_map.get_layer_by_name(name))
+    except ValueError:
+        return []
+
+def map_dependencies(map_path):
+    dependencies, pending = [], [map_path]
+    while pending:
+        file_path = pending.pop()
+        folder = path.dirname(file_path)
+        for element in ElementTree.parse(file_path).iter():
+            source = element.get('source')
+            if element.tag in ('tileset', 'image') and source:
+                source_path = path.normpath(join(folder, source))
+                if path.exists(source_path) and source_path not in dependencies:
+                    dependencies.append(source_path)
+                    if element.tag == 'tileset':
+                        pending.append(source_path)
+    return {dependency: path.getmtime(dependency) for dependency in dependencies}
+
+def compile_map(map_path):
+    from pytmx.util_pygame import load_pygame
+
+    tmx_map = load_pygame(map_path)
+    surfaces, surface_indices = [], {}
+
+    def surface_index(gid, image):
+        if gid not in surface_indices:
+            surface_indices[gid] = len(surfaces)
+            surfaces.append(image)
+        return surface_indices[gid]
+
+    ground = np.full((tmx_map.height, tmx_map.width), -1, dtype = np.int32)
+    for x, y, gid in tmx_map.get_layer_by_name('Ground').iter_data():
+        image = tmx_map.get_tile_image_by_gid(gid)
+        if image:
+            ground[y, x] = surface_index(gid, image)
+
+    objects = np.array([(obj.x, obj.y, surface_index(obj.gid, obj.image)) for obj in layer_objects(tmx_map, 'Objects')], dtype = np.float64).reshape(-1, 3)
+    collisions = np.array([(obj.x, obj.y, obj.width, obj.height) for obj in layer_objects(tmx_map, 'Collisions')], dtype = np.float64).reshape(-1, 4)
+    entities = layer_objects(tmx_map, 'Entities')
+    player_spawn = np.array([(obj.x, obj.y) for obj in entities if obj.name == 'Player'], dtype = np.float64).reshape(-1, 2)
+    spawns = np.array([(obj.x, obj.y) for obj in entities if obj.name != 'Player'], dtype = np.float64).reshape(-1, 2)
+    drops = np.array([(obj.x, obj.y) for obj in layer_objects(tmx_map, 'Ability') if obj.name == 'Drop'], dtype = np.float64).reshape(-1, 2)
+
+    atlas, rects = pack_surfaces(surfaces, ATLAS_WIDTH)
+    arrays = {'ground': ground, 'objects': objects, 'collisions': collisions, 'player_spawn': player_spawn, 'spawns': spawns, 'drops': drops}
+    blobs, offset, layout = [], 0, {}
+    for name, array in arrays.items():
+        layout[name] = {'offset': offset, 'dtype': array.dtype.str, 'shape': array.shape}
+        blobs.append(array.tobytes())
+        offset += len(blobs[-1])
+    layout['atlas'] = {'offset': offset, 'size': atlas.get_size()}
+    blobs.append(pygame.image.tobytes(atlas, 'RGBA'))
+
+    meta = json.dumps({'width': tmx_map.width, 'height': tmx_map.height, 'rects': [tuple(rect) for rect in rects], 'layout': layout, 'dependencies': map_dependencies(map_path)}).encode()
+    cache_path = cache_path_for(map_path)
+    temp_path = f'{cache_path}.{getpid()}.tmp'
+    makedirs(CACHE_DIR, exist_ok = True)
+    with open(temp_path, 'wb') as file:
+        file.write(CACHE_HEADER.pack(CACHE_MAGIC, path.getmtime(map_path), len(meta)))
+        file.write(meta)
+        for blob in blobs:
+            file.write(blob)
+    replace(temp_path, cache_path)
+    return cache_path
+
+def read_cache(map_path):
+    cache_path = cache_path_for(map_path)
+    if not path.exists(cache_path):
+        return None
+    with open(cache_path, 'rb') as file:
+        data = file.read()
+
+    try:
+        return parse_cache(map_path, data)
+    except (struct.error, ValueError, KeyError):
+        return None
+
+def parse_cache(map_path, data):
+    magic, mtime, meta_length = CACHE_HEADER.unpack_from(data)
+    if magic != CACHE_MAGIC or mtime != path.getmtime(map_path):
+        return None
+    meta = json.loads(data[CACHE_HEADER.size:CACHE_HEADER.size + meta_length])
+    if any(not path.exists(dependency) or path.getmtime(dependency) != mtime for dependency, mtime in meta['dependencies'].items()):
+        return None
+    body = CACHE_HEADER.size + meta_length
+    layout = meta['layout']
+
+    def array(name):
+        entry = layout[name]
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape']))
+        return np.frombuffer(data, dtype, count, body + entry['offset']).reshape(entry['shape'])
+
+    atlas_entry = layout['atlas']
+    atlas_size = tuple(atlas_entry['size'])
+    atlas_start = body + atlas_entry['offset']
+    atlas = pygame.image.frombuffer(data[atlas_start:atlas_start + atlas_size[0] * atlas_size[1] * 4], atlas_size, 'RGBA').convert_alpha()
+    images = [atlas.subsurface(rect) for rect in meta['rects']]
+
+    player_spawn = array('player_spawn')
+    return MapData(
+        meta['width'], meta['height'], array('ground'),
+        [(x, y, index) for x, y, index in array('objects').tolist()],
+        [tuple(rect) for rect in array('collisions').tolist()],
+        tuple(player_spawn[0].tolist()) if len(player_spawn) else None,
+        [tuple(pos) for pos in array('spawns').tolist()],
+        [tuple(pos) for pos in array('drops').tolist()],
+        images)
+
+def load_map(map_path):
+    map_data = read_cache(map_path)
+    if not map_data:
+        compile_map(map_path)
+        map_data = read_cache(map_path)
+    return map_data
+
+if __name__ == '__main__':
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    map_paths = sys.argv[1:] or [join('data', 'maps', file_name) for file_name in sorted(next(walk(join('data', 'maps')))[2]) if file_name.endswith('.tmx')]
+    for map_path in map_paths:
+        print(f'{map_path} -> {compile_map(map_path)}')
@@ -0,0 +1,75 @@
+from settings import *
+from heapq import heappush, heappop
+from math import sqrt
+
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+class FlowField:
+    def __init__(self, width, height, obstacles, clearance):
+        self.width, self.height = width, height
+        self.walkable = [True] * (width * height)
+        self.next_tiles = [None] * (width * height)
+        self.target_tile = None
+        self.version = 0
+
+        for rect in obstacles:
+            rect = rect.inflate(clearance)
+            for y in range(max(0, rect.top // TILE_SIZE), min(height, (rect.bottom - 1) // TILE_SIZE + 1)):
+                for x in range(max(0, rect.left // TILE_SIZE), min(width, (rect.right - 1) // TILE_SIZE + 1)):
+                    if rect.collidepoint(self.tile_center(x, y)):
+                        self.walkable[y * width + x] = False
+
+        self.centers = [self.tile_center(index % width, index // width) for index in range(width * height)]
+        self.edges = [list(self.neighbours(index % width, index // width)) for index in range(width * height)]
+
+    def tile_center(self, x, y):
+        return x * TILE_SIZE + TILE_SIZE / 2, y * TILE_SIZE + TILE_SIZE / 2
+
+    def tile_at(self, pos):
+        return int(pos[0] // TILE_SIZE), int(pos[1] // TILE_SIZE)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_walkable(self, x, y):
+        return self.walkable[y * self.width + x]
+
+    def neighbours(self, x, y):
+        for dx, dy in NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if not self.in_bounds(nx, ny):
+                continue
+            if dx and dy and self.is_walkable(x, y) and self.is_walkable(nx, ny) and not (self.is_walkable(nx, y) and self.is_walkable(x, ny)):
+                continue
+            step = sqrt(2) if dx and dy else 1
+            yield ny * self.width + nx, step if self.is_walkable(nx, ny) else step * BLOCKED_TILE_COST
+
+    def update(self, target_pos):
+        tile = self.tile_at(target_pos)
+        if tile != self.target_tile and self.in_bounds(*tile):
+            self.target_tile = tile
+            self.build(tile[1] * self.width + tile[0])
+            self.version += 1
+
+    def build(self, target):
+        costs = [None] * len(self.walkable)
+        costs[target] = 0
+        self.next_tiles[target] = None
+        queue = [(0, target)]
+        while queue:
+            cost, index = heappop(queue)
+            if cost > costs[index]:
+                continue
+            for neighbour, weight in self.edges[index]:
+                new_cost = cost + weight
+                if costs[neighbour] is None or new_cost < costs[neighbour]:
+                    costs[neighbour] = new_cost
+                    self.next_tiles[neighbour] = self.centers[index]
+                    heappush(queue, (new_cost, neighbour))
+
+    def direction_at(self, pos):
+        x, y = self.tile_at(pos)
+        if self.in_bounds(x, y) and self.next_tiles[y * self.width + x]:
+            direction = pygame.Vector2(self.next_tiles[y * self.width + x]) - pos
+            if direction:
+                return direction.normalize()
@@ -1,15 +1,22 @@
 import pygame
 from settings import *
-from os import walk, path
+from sprites import cache_masks, get_mask
+from assets import load_image, load_folder
+from timing import scheduler
+from os import path
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, collision_sprites):
+    def __init__(self, pos, groups, collision_sprites, controls):
         super().__init__(groups)
+        self.controls = controls
         self.load_images()
         self.state, self.frame_index = 'right', 0
-        self.image = pygame.image.load(path.join('images', 'player', 'down', '0.png')).convert_alpha()
+        self.image = load_image(path.join('images', 'player', 'down', '0.png'))
         self.rect = self.image.get_rect(center=pos)
+        self.mask = get_mask(self.image)
         self.hitbox_rect = self.rect.inflate(-60, -90)
+        self.view_rect = pygame.Rect(0, 0, WINDOW_WIDTH + ENEMY_LOD_MARGIN * 2, WINDOW_HEIGHT + ENEMY_LOD_MARGIN * 2)
+        self.view_rect.center = self.rect.center
     
         self.direction = pygame.Vector2()
         self.speed = PLAYER_SPEED
@@ -20,26 +27,17 @@ class Player(pygame.sprite.Sprite):
         self.current_health = MAX_HEALTH
 
         self.invincible = False
-        self.invincibility_duration = 10 
-        self.invincibility_timer = 0
-        
-        self.active_abilities = []
+        self.active_abilities = {}
 
     def load_images(self):
         self.frames = {'left': [], 'right': [], 'up': [], 'down': []}
 
         for state in self.frames.keys():
-            for folder_path, sub_folders, file_names in walk(path.join('images', 'player', state)):
-                if file_names:
-                    for file_name in sorted(file_names, key=lambda name: int(name.split('.')[0])):
-                        full_path = path.join(folder_path, file_name)
-                        surf = pygame.image.load(full_path).convert_alpha()
-                        self.frames[state].append(surf)
+            self.frames[state] = load_folder(path.join('images', 'player', state))
+            cache_masks(self.frames[state])
 
     def input(self):
-        keys = pygame.key.get_pressed()
-        self.direction.x = int(keys[pygame.K_RIGHT] or keys[pygame.K_d]) - int(keys[pygame.K_LEFT] or keys[pygame.K_a])
-        self.direction.y = int(keys[pygame.K_DOWN] or keys[pygame.K_s]) - int(keys[pygame.K_UP] or keys[pygame.K_w])
+        self.direction = self.controls.movement()
         self.direction = self.direction.normalize() if self.direction else self.direction
 
     def move(self, dt):
@@ -50,7 +48,7 @@ class Player(pygame.sprite.Sprite):
         self.rect.center = self.hitbox_rect.center
 
     def collision(self, direction):
-        for sprite in self.collision_sprites:
+        for sprite in self.collision_sprites.query(self.hitbox_rect):
             if sprite.rect.colliderect(self.hitbox_rect):
                 if direction == 'horizontal':
                     if self.direction.x > 0: self.hitbox_rect.right = sprite.rect.left
@@ -67,6 +65,7 @@ class Player(pygame.sprite.Sprite):
 
         self.frame_index = self.frame_index + 5 * dt if self.direction else 0
         self.image = self.frames[self.state][int(self.frame_index) % len(self.frames[self.state])]
+        self.mask = get_mask(self.image)
 
     def take_damage(self, amount):
         if not self.invincible:  
@@ -87,19 +86,26 @@ class Player(pygame.sprite.Sprite):
     def is_alive(self):
         return self.current_health > 0
 
+    def start_ability(self, ability, duration, expire):
+        scheduler.cancel(self.active_abilities.get(ability))
+        self.active_abilities[ability] = scheduler.schedule(duration * 1000, self.expire_ability, ability, expire)
+
+    def expire_ability(self, ability, expire):
+        del self.active_abilities[ability]
+        expire()
+
     def activate_invincibility(self, duration):
         self.invincible = True
-        self.invincibility_start_time = pygame.time.get_ticks()
-        self.invincibility_duration = duration
-        self.active_abilities.append(('invincibility', duration)) 
+        self.start_ability('invincibility', duration, self.end_invincibility)
+
+    def end_invincibility(self):
+        self.invincible = False
     
     def increase_speed(self, amount, duration):
         self.speed += amount
         if self.speed > self.max_speed:
             self.speed = self.max_speed  
-        self.speed_boost_start_time = pygame.time.get_ticks()
-        self.speed_boost_duration = duration
-        self.active_abilities.append(('speed', duration))
+        self.start_ability('speed', duration, self.reset_speed)
         
     def reset_speed(self):
         self.speed = PLAYER_SPEED
@@ -107,19 +113,5 @@ class Player(pygame.sprite.Sprite):
     def update(self, dt):
         self.input()
         self.move(dt)
-        self.animate(dt)
-
-        if self.invincible and (pygame.time.get_ticks() - self.invincibility_start_time >= self.invincibility_duration * 1000):
-            self.invincible = False
-
-        if hasattr(self, 'speed_boost_start_time'):
-            if pygame.time.get_ticks() - self.speed_boost_start_time >= self.speed_boost_duration * 1000:
-                self.reset_speed()
-                del self.speed_boost_start_time  
-
-        current_time = pygame.time.get_ticks()
-        self.active_abilities = [
-            (ability, duration) for ability, duration in self.active_abilities
-            if ability != 'speed' or (hasattr(self, 'speed_boost_start_time') and current_time - self.speed_boost_start_time < duration * 1000)
-            if ability != 'invincibility' or (hasattr(self, 'invincibility_start_time') and current_time - self.invincibility_start_time < duration * 1000)
-        ]
\ No newline at end of file
+        self.view_rect.center = self.rect.center
+        self.animate(dt)
\ No newline at end of file
@@ -0,0 +1,98 @@
+from settings import *
+from assets import load_font
+from collections import deque
+from time import perf_counter
+import json
+
+def percentile(values, percent):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+class Profiler:
+    def __init__(self, size = PROFILER_FRAMES):
+        self.frames = deque(maxlen = size)
+        self.events = []
+        self.frame_start = None
+        self.phase_name = None
+        self.phase_start = 0
+        self.overlay = False
+        self.font = None
+
+    def begin_frame(self):
+        self.end_frame()
+        self.frame_start = self.phase_start = perf_counter()
+        self.phase_name = None
+        self.events = []
+
+    def mark(self, name):
+        now = perf_counter()
+        if self.phase_name:
+            self.events.append((self.phase_name, self.phase_start, now - self.phase_start))
+        self.phase_name, self.phase_start = name, now
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        self.mark(None)
+        self.frames.append((self.frame_start, perf_counter() - self.frame_start, self.events))
+        self.frame_start = None
+
+    def frame_times(self, count = None):
+        frames = list(self.frames)[-count:] if count else self.frames
+        return [duration * 1000 for _, duration, _ in frames]
+
+    def busy_times(self, count = None):
+        frames = list(self.frames)[-count:] if count else self.frames
+        return [sum(duration for name, _, duration in events if name != 'wait') * 1000 for _, _, events in frames]
+
+    def averages(self, count = None):
+        frames = list(self.frames)[-count:] if count else list(self.frames)
+        totals = {}
+        for _, _, events in frames:
+            for name, _, duration in events:
+                totals[name] = totals.get(name, 0) + duration * 1000
+        return {name: total / len(frames) for name, total in totals.items()}
+
+    def dump(self, path = PROFILER_TRACE_PATH):
+        trace = []
+        for frame_start, duration, events in self.frames:
+            trace.append({'name': 'frame', 'ph': 'X', 'ts': frame_start * 1e6, 'dur': duration * 1e6, 'pid': 0, 'tid': 0})
+            for name, start, phase_duration in events:
+                trace.append({'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': phase_duration * 1e6, 'pid': 0, 'tid': 1})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, file)
+        return path
+
+    def draw_overlay(self, surface, fps, counts):
+        if not self.font:
+            self.font = load_font(join('fonts', 'upheavtt.ttf'), 18)
+
+        frame_times = self.frame_times()
+        busy_times = self.busy_times()
+        lines = [
+            f'FPS {fps:5.1f}',
+            'frame  p50 {:5.2f}  p95 {:5.2f}  p99 {:5.2f} ms'.format(*(percentile(frame_times, p) for p in (50, 95, 99))),
+            'busy   p50 {:5.2f}  p95 {:5.2f}  p99 {:5.2f} ms'.format(*(percentile(busy_times, p) for p in (50, 95, 99)))
+        ]
+        lines += [f'{name:<12} {value:6.2f} ms' for name, value in self.averages(PROFILER_AVERAGE_FRAMES).items() if name != 'wait']
+        lines += [f'{name:<12} {count}' for name, count in counts.items()]
+
+        line_height = self.font.get_linesize()
+        graph_width, graph_height = PROFILER_GRAPH_SIZE
+        panel = pygame.Surface((max(graph_width, 300) + 20, len(lines) * line_height + graph_height + 30), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for index, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, (255, 255, 255)), (10, 10 + index * line_height))
+
+        graph_top = len(lines) * line_height + 20
+        scale = graph_height / PROFILER_GRAPH_MS
+        budget_y = graph_top + graph_height - int(1000 / TICK_RATE * scale)
+        pygame.draw.line(panel, (255, 200, 0), (10, budget_y), (10 + graph_width, budget_y))
+        for x, frame_time in enumerate(frame_times[-graph_width:]):
+            height = min(graph_height, int(frame_time * scale))
+            color = (80, 220, 80) if frame_time <= 1000 / TICK_RATE else (230, 60, 60)
+            pygame.draw.line(panel, color, (10 + x, graph_top + graph_height), (10 + x, graph_top + graph_height - height))
+
+        surface.blit(panel, (10, WINDOW_HEIGHT - panel.get_height() - 10))
@@ -0,0 +1,61 @@
+from settings import *
+import json
+import struct
+import zlib
+
+RECORDING_HEADER = struct.Struct('<4sI')
+RECORDING_MAGIC = b'JHR1'
+RECORDING_STEP = struct.Struct('<Idddd?')
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self.steps = []
+
+    def clear(self):
+        self.steps = []
+
+    def capture(self, controls):
+        movement, aim = controls.movement(), controls.aim()
+        frame = [movement.x, movement.y, aim.x, aim.y, bool(controls.shooting())]
+        if self.steps and self.steps[-1][1:] == frame:
+            self.steps[-1][0] += 1
+        else:
+            self.steps.append([1] + frame)
+
+    def save(self, game):
+        if not self.steps:
+            return None
+        meta = {
+            'seed': game.game_seed,
+            'tick_rate': TICK_RATE,
+            'params': game.params,
+            'frames': sum(step[0] for step in self.steps),
+            'score': game.score,
+            'wave': game.current_wave,
+            'health': game.player.current_health,
+            'game_over': game.game_over
+        }
+        return write_recording(self.path, meta, self.steps)
+
+def write_recording(path, meta, steps):
+    meta = json.dumps(meta).encode()
+    body = zlib.compress(b''.join(RECORDING_STEP.pack(*step) for step in steps))
+    with open(path, 'wb') as file:
+        file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, len(meta)))
+        file.write(meta)
+        file.write(body)
+    return path
+
+def read_recording(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    magic, meta_length = RECORDING_HEADER.unpack_from(data)
+    if magic != RECORDING_MAGIC:
+        raise ValueError(f'{path} is not a recording')
+    meta = json.loads(data[RECORDING_HEADER.size:RECORDING_HEADER.size + meta_length])
+    if meta['tick_rate'] != TICK_RATE:
+        raise ValueError(f'{path} was recorded at {meta["tick_rate"]} ticks per second, not {TICK_RATE}')
+    body = zlib.decompress(data[RECORDING_HEADER.size + meta_length:])
+    return meta, list(RECORDING_STEP.iter_unpack(body))
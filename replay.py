@@ -0,0 +1,56 @@
+from os import environ
+environ['SDL_VIDEODRIVER'] = 'dummy'
+environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import sys
+import json
+from statistics import mean
+from main import Game
+from controls import ScriptedControls
+from profiler import Profiler, percentile
+from recording import read_recording
+
+WORST_FRAMES = 10
+
+def frame_phases(events):
+    phases = {}
+    for name, _, duration in events:
+        phases[name] = phases.get(name, 0) + duration * 1000
+    return phases
+
+def replay(path, trace_path = None):
+    meta, steps = read_recording(path)
+    game = Game(headless = True, controls = ScriptedControls(steps, loop = False), params = meta['params'], seed = meta['seed'])
+    game.profiler = Profiler(meta['frames'])
+    stats = game.run_headless(meta['frames'] / meta['tick_rate'])
+
+    frames = list(game.profiler.frames)
+    frame_times = game.profiler.frame_times()
+    worst = sorted(range(len(frames)), key = lambda index: -frame_times[index])[:WORST_FRAMES]
+    if trace_path:
+        game.profiler.dump(trace_path)
+
+    return {
+        'recording': path,
+        'seed': meta['seed'],
+        'in_sync': all(stats[key] == meta[key] for key in ('score', 'wave', 'health', 'game_over')) and stats['ticks'] == meta['frames'],
+        'recorded': {key: meta[key] for key in ('frames', 'score', 'wave', 'health', 'game_over')},
+        'replayed': stats,
+        'frame_ms': {
+            'mean': mean(frame_times) if frame_times else 0,
+            'p95': percentile(frame_times, 95),
+            'p99': percentile(frame_times, 99),
+            'max': max(frame_times, default = 0)
+        },
+        'worst_frames': [{
+            'tick': index,
+            'ms': frame_times[index],
+            'phases': frame_phases(frames[index][2])
+        } for index in worst]
+    }
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python replay.py recording.jhr [trace.json]')
+        sys.exit(1)
+    print(json.dumps(replay(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None), indent = 4))
@@ -0,0 +1,48 @@
+from settings import *
+
+class DirtyScreen:
+    def __init__(self, surface):
+        self.surface = surface
+        self.background = None
+        self.layers = {}
+        self.dirty = []
+        self.full = True
+
+    def show(self, background):
+        self.background = background
+        self.layers.clear()
+        self.invalidate()
+
+    def set_background(self, background):
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self):
+        self.full = True
+
+    def set(self, name, image, rect):
+        rect = pygame.Rect(rect)
+        current = self.layers.get(name)
+        if current and current[0] is image and current[1] == rect:
+            return
+        if current and current[1] != rect:
+            self.dirty.append(current[1])
+        self.layers[name] = (image, rect)
+        self.dirty.append(rect)
+
+    def draw(self):
+        if self.full:
+            self.full = False
+            self.dirty.clear()
+            self.surface.blit(self.background, (0, 0))
+            for image, rect in self.layers.values():
+                self.surface.blit(image, rect)
+            return [self.surface.get_rect()]
+
+        dirty, self.dirty = self.dirty, []
+        for rect in dirty:
+            self.surface.blit(self.background, rect, rect)
+        for image, rect in self.layers.values():
+            if rect.collidelist(dirty) != -1:
+                self.surface.blit(image, rect)
+        return dirty
@@ -7,6 +7,14 @@ WINDOW_WIDTH, WINDOW_HEIGHT = 1280,720
 WORLD_WIDTH, WORLD_HEIGHT = 52, 50
 FONT_SIZE = 36
 TILE_SIZE = 64
+CHUNK_SIZE = 8
+GRID_CELL_SIZE = TILE_SIZE * 2
+
+# SIMULATION
+FIXED_TIMESTEP = True
+TICK_RATE = 60
+MAX_FPS = 120
+MAX_FRAME_TIME = 0.25
 
 #GAMEPLAY
 MAX_HEALTH = 100
@@ -14,15 +22,45 @@ BOSS_HEALTH = 1000
 ABILITY_DELAY = 30
 PLAYER_SPEED = 500
 ENEMY_SPEED = 100
+ENEMY_LOD_INTERVAL = 4
+ENEMY_LOD_MARGIN = 128
 SPAWN_INTERVAL = 1000
+BLOCKED_TILE_COST = 10
+HORDE_MODE = False
+HORDE_BATCH = 25
+WAVE_DURATION = 60
+WAVE_SPEED_STEP = 20
+WAVE_INTERVAL_STEP = 50
+MIN_SPAWN_INTERVAL = 100
+GAME_PARAMS = {
+    'wave_duration': WAVE_DURATION,
+    'enemy_speed': ENEMY_SPEED,
+    'spawn_interval': SPAWN_INTERVAL,
+    'ability_delay': ABILITY_DELAY,
+    'max_health': MAX_HEALTH,
+    'wave_speed_step': WAVE_SPEED_STEP,
+    'wave_interval_step': WAVE_INTERVAL_STEP,
+    'min_spawn_interval': MIN_SPAWN_INTERVAL
+}
 
 # MENU
 BUTTON_WIDTH, BUTTON_HEIGHT = 250, 150 
 BUTTON_SPACING = 20
 FRAME_DELAY = 1 / 60
+MENU_FPS = 60
+VIDEO_BUFFER_SIZE = 8
 
 # UI
 HEALTH_WIDTH = 200 
 HEALTH_HEIGHT = 20
 HEALTH_X = 50
-HEALTH_Y = 50
\ No newline at end of file
+HEALTH_Y = 50
+HUD_TEXT_CACHE_SIZE = 256
+# PROFILER
+PROFILER_FRAMES = 600
+PROFILER_AVERAGE_FRAMES = 60
+PROFILER_GRAPH_SIZE = (300, 60)
+PROFILER_GRAPH_MS = 50
+PROFILER_TRACE_PATH = 'trace.json'
+PROFILER_OVERLAY_KEY = pygame.K_F3
+PROFILER_DUMP_KEY = pygame.K_F4
@@ -1,18 +1,34 @@
 from settings import * 
+from assets import load_image
+from timing import get_ticks
 from math import atan2, degrees
 
-class Sprite(pygame.sprite.Sprite):
-    def __init__(self, pos, surf, groups):
-        super().__init__(groups)
-        self.image = surf
-        self.rect = self.image.get_rect(topleft = pos)
-        self.ground = True
+mask_cache = {}
+silhouette_cache = {}
+
+def get_mask(surf):
+    if surf not in mask_cache:
+        mask_cache[surf] = pygame.mask.from_surface(surf)
+    return mask_cache[surf]
+
+def get_silhouette(surf):
+    if surf not in silhouette_cache:
+        silhouette = get_mask(surf).to_surface()
+        silhouette.set_colorkey('black')
+        silhouette_cache[surf] = silhouette
+    return silhouette_cache[surf]
+
+def cache_masks(frames):
+    for surf in frames:
+        get_mask(surf)
+        get_silhouette(surf)
 
 class CollisionSprite(pygame.sprite.Sprite):
     def __init__(self, pos, surf, groups):
-        super().__init__(groups)
         self.image = surf
         self.rect = self.image.get_rect(topleft = pos)
+        self.static = True
+        super().__init__(groups)
 
 class Gun(pygame.sprite.Sprite):
     def __init__(self, player, groups):
@@ -21,14 +37,12 @@ class Gun(pygame.sprite.Sprite):
         self.player_direction = pygame.Vector2(0,1)
  
         super().__init__(groups)
-        self.gun_surf = pygame.image.load(join('images', 'gun', 'gun.png')).convert_alpha()
+        self.gun_surf = load_image(join('images', 'gun', 'gun.png'))
         self.image = self.gun_surf
         self.rect = self.image.get_rect(center = self.player.rect.center + self.player_direction * self.distance)
     
     def get_direction(self):
-        mouse_pos = pygame.Vector2(pygame.mouse.get_pos())
-        player_pos = pygame.Vector2(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
-        self.player_direction = (mouse_pos - player_pos).normalize()
+        self.player_direction = self.player.controls.aim().normalize()
 
     def rotate_gun(self):
         angle = degrees(atan2(self.player_direction.x, self.player_direction.y)) - 90
@@ -43,134 +57,146 @@ class Gun(pygame.sprite.Sprite):
         self.rotate_gun()
         self.rect.center = self.player.rect.center + self.player_direction * self.distance
 
-class Bullet(pygame.sprite.Sprite):
+class PooledSprite(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.pool = None
+
+    def kill(self):
+        if self.alive():
+            super().kill()
+            if self.pool:
+                self.pool.release(self)
+
+class Bullet(PooledSprite):
     def __init__(self, surf, pos, direction, groups):
-        super().__init__(groups)
-        self.image = surf 
-        self.rect = self.image.get_rect(center = pos)
-        self.spawn_time = pygame.time.get_ticks()
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.direction = pygame.Vector2()
         self.lifetime = 1000
-
-        self.direction = direction 
         self.speed = 1200
+        self.reset(surf, pos, direction, groups)
+
+    def reset(self, surf, pos, direction, groups):
+        self.image = surf 
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
+        self.mask = get_mask(self.image)
+        self.spawn_time = get_ticks()
+        self.direction.update(direction)
+        self.add(groups)
     
     def update(self, dt):
         self.rect.center += self.direction * self.speed * dt
 
-        if pygame.time.get_ticks() - self.spawn_time >= self.lifetime:
+        if get_ticks() - self.spawn_time >= self.lifetime:
             self.kill()
 
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, pos, frames, groups, player, collision_sprites, speed):
-        super().__init__(groups)
+class Enemy(PooledSprite):
+    spawn_count = 0
+
+    def __init__(self, pos, frames, groups, player, collision_sprites, speed, flow_field):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.hitbox_rect = pygame.Rect(0, 0, 0, 0)
+        self.position = pygame.Vector2()
+        self.direction = pygame.Vector2()
+        self.animation_speed = 6
+        self.death_duration = 400
+        self.reset(pos, frames, groups, player, collision_sprites, speed, flow_field)
+
+    def reset(self, pos, frames, groups, player, collision_sprites, speed, flow_field):
         self.player = player
+        self.flow_field = flow_field
 
         self.frames, self.frame_index = frames, 0 
         self.image = self.frames[self.frame_index]
-        self.animation_speed = 6
+        self.mask = get_mask(self.image)
         
-        self.rect = self.image.get_rect(center=pos)
-        self.hitbox_rect = self.rect.inflate(-20, -40)
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
+        self.hitbox_rect.size = (self.rect.width - 20, self.rect.height - 40)
+        self.hitbox_rect.center = self.rect.center
+        self.position.update(self.hitbox_rect.center)
         self.collision_sprites = collision_sprites
-        self.direction = pygame.Vector2()
-        self.speed = ENEMY_SPEED
+        self.direction.update(0, 0)
+        self.speed = speed
 
         self.death_time = 0
-        self.death_duration = 400
+        self.lod_time = 0
+        self.lod_frame = Enemy.spawn_count % ENEMY_LOD_INTERVAL
+        Enemy.spawn_count += 1
+        self.add(groups)
     
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt
         self.image = self.frames[int(self.frame_index) % len(self.frames)]
+        self.mask = get_mask(self.image)
 
     def move(self, dt):
-        player_pos = pygame.Vector2(self.player.rect.center)
-        enemy_pos = pygame.Vector2(self.rect.center)
-        direction_vector = player_pos - enemy_pos
-
-        if direction_vector.length() > 0:
-            self.direction = direction_vector.normalize()
+        flow_direction = self.flow_field.direction_at(self.hitbox_rect.center)
+        if flow_direction:
+            self.direction = flow_direction
+        else:
+            player_pos = pygame.Vector2(self.player.rect.center)
+            enemy_pos = pygame.Vector2(self.rect.center)
+            direction_vector = player_pos - enemy_pos
 
-        if self.check_collision(self.direction):
-            self.direction = self.avoid_obstacle(self.direction)
+            if direction_vector.length() > 0:
+                self.direction = direction_vector.normalize()
 
-        self.hitbox_rect.x += self.direction.x * self.speed * dt
+        self.position.x += self.direction.x * self.speed * dt
+        self.hitbox_rect.centerx = round(self.position.x)
         self.collision('horizontal')
-        self.hitbox_rect.y += self.direction.y * self.speed * dt
+        self.position.y += self.direction.y * self.speed * dt
+        self.hitbox_rect.centery = round(self.position.y)
         self.collision('vertical')
         self.rect.center = self.hitbox_rect.center
 
-    def check_collision(self, direction):
-        future_rect = self.hitbox_rect.copy()
-        future_rect.x += direction.x * self.speed * 0.1  
-        for sprite in self.collision_sprites:
-            if future_rect.colliderect(sprite.rect):
-                return True
-        return False
-
-    def avoid_obstacle(self, direction):
-        ray_length = 50  
-        right_direction = pygame.Vector2(-direction.y, direction.x)  
-        left_direction = pygame.Vector2(direction.y, -direction.x)  
-
-        if self.raycast(direction, ray_length):
-            if not self.raycast(right_direction, ray_length):
-                return right_direction
-            elif not self.raycast(left_direction, ray_length):
-                return left_direction
-
-        return direction 
-
-    def raycast(self, direction, length):
-        start_pos = self.hitbox_rect.center
-        end_pos = start_pos + direction * length
-        for sprite in self.collision_sprites:
-            if self.line_rect_collision(start_pos, end_pos, sprite.rect):
-                return True
-        return False
-
-    def line_rect_collision(self, start, end, rect):
-        line = pygame.Rect(start, (end[0] - start[0], end[1] - start[1]))
-        return line.colliderect(rect)
-
     def collision(self, direction):
-        for sprite in self.collision_sprites:
+        for sprite in self.collision_sprites.query(self.hitbox_rect):
             if sprite.rect.colliderect(self.hitbox_rect):
                 if direction == 'horizontal':
                     if self.direction.x > 0: 
                         self.hitbox_rect.right = sprite.rect.left
                     if self.direction.x < 0: 
                         self.hitbox_rect.left = sprite.rect.right
+                    self.position.x = self.hitbox_rect.centerx
                 else:
                     if self.direction.y < 0: 
                         self.hitbox_rect.top = sprite.rect.bottom
                     if self.direction.y > 0: 
                         self.hitbox_rect.bottom = sprite.rect.top
-
-                self.hitbox_rect.x -= self.direction.x * 2  
-                self.hitbox_rect.y -= self.direction.y * 2  
+                    self.position.y = self.hitbox_rect.centery
 
     def destroy(self):
-        self.death_time = pygame.time.get_ticks()
+        self.death_time = get_ticks()
 
-        surf = pygame.mask.from_surface(self.frames[0]).to_surface()
-        surf.set_colorkey('black')
-        self.image = surf
+        self.image = get_silhouette(self.frames[0])
     
     def death_timer(self):
-        if pygame.time.get_ticks() - self.death_time >= self.death_duration:
+        if get_ticks() - self.death_time >= self.death_duration:
             self.kill()
 
     def update(self, dt):
         if self.death_time == 0:
-            self.move(dt)
-            self.animate(dt)
+            self.lod_time += dt
+            self.lod_frame += 1
+            on_screen = self.player.view_rect.colliderect(self.rect)
+            if on_screen or self.lod_frame >= ENEMY_LOD_INTERVAL:
+                self.move(self.lod_time)
+                if on_screen:
+                    self.animate(self.lod_time)
+                self.lod_time = 0
+                self.lod_frame = 0
         else:
             self.death_timer()
             
 class Boss(pygame.sprite.Sprite):
-    def __init__(self, pos, frames, groups, player, collision_sprites):
+    def __init__(self, pos, frames, groups, player, collision_sprites, flow_field):
         super().__init__(groups)
         self.player = player
+        self.flow_field = flow_field
 
         self.frames, self.frame_index = frames, 0 
         self.image = self.frames[self.frame_index]
@@ -182,6 +208,7 @@ class Boss(pygame.sprite.Sprite):
         
         self.rect = self.image.get_rect(center=pos)
         self.hitbox_rect = self.rect.inflate(-20, -40)
+        self.position = pygame.Vector2(self.hitbox_rect.center)
         self.collision_sprites = collision_sprites
         self.direction = pygame.Vector2()
         self.speed = ENEMY_SPEED * 1.5  
@@ -195,71 +222,40 @@ class Boss(pygame.sprite.Sprite):
         self.image = self.frames[int(self.frame_index) % len(self.frames)]
 
     def move(self, dt):
-        player_pos = pygame.Vector2(self.player.rect.center)
-        boss_pos = pygame.Vector2(self.rect.center)
-        direction_vector = player_pos - boss_pos
-
-        if direction_vector.length() > 0:
-            self.direction = direction_vector.normalize()
+        flow_direction = self.flow_field.direction_at(self.hitbox_rect.center)
+        if flow_direction:
+            self.direction = flow_direction
+        else:
+            player_pos = pygame.Vector2(self.player.rect.center)
+            boss_pos = pygame.Vector2(self.rect.center)
+            direction_vector = player_pos - boss_pos
 
-        if self.check_collision(self.direction):
-            self.direction = self.avoid_obstacle(self.direction)
+            if direction_vector.length() > 0:
+                self.direction = direction_vector.normalize()
 
-        self.hitbox_rect.x += self.direction.x * self.speed * dt
+        self.position.x += self.direction.x * self.speed * dt
+        self.hitbox_rect.centerx = round(self.position.x)
         self.collision('horizontal')
-        self.hitbox_rect.y += self.direction.y * self.speed * dt
+        self.position.y += self.direction.y * self.speed * dt
+        self.hitbox_rect.centery = round(self.position.y)
         self.collision('vertical')
         self.rect.center = self.hitbox_rect.center
 
-    def check_collision(self, direction):
-        future_rect = self.hitbox_rect.copy()
-        future_rect.x += direction.x * self.speed * 0.1  
-        for sprite in self.collision_sprites:
-            if future_rect.colliderect(sprite.rect):
-                return True
-        return False
-
-    def avoid_obstacle(self, direction):
-        ray_length = 50  
-        right_direction = pygame.Vector2(-direction.y, direction.x)  
-        left_direction = pygame.Vector2(direction.y, -direction.x)  
-
-        if self.raycast(direction, ray_length):
-            if not self.raycast(right_direction, ray_length):
-                return right_direction
-            elif not self.raycast(left_direction, ray_length):
-                return left_direction
-
-        return direction 
-
-    def raycast(self, direction, length):
-        start_pos = self.hitbox_rect.center
-        end_pos = start_pos + direction * length
-        for sprite in self.collision_sprites:
-            if self.line_rect_collision(start_pos, end_pos, sprite.rect):
-                return True
-        return False
-
-    def line_rect_collision(self, start, end, rect):
-        line = pygame.Rect(start, (end[0] - start[0], end[1] - start[1]))
-        return line.colliderect(rect)
-
     def collision(self, direction):
-        for sprite in self.collision_sprites:
+        for sprite in self.collision_sprites.query(self.hitbox_rect):
             if sprite.rect.colliderect(self.hitbox_rect):
                 if direction == 'horizontal':
                     if self.direction.x > 0: 
                         self.hitbox_rect.right = sprite.rect.left
                     if self.direction.x < 0: 
                         self.hitbox_rect.left = sprite.rect.right
+                    self.position.x = self.hitbox_rect.centerx
                 else:
                     if self.direction.y < 0: 
                         self.hitbox_rect.top = sprite.rect.bottom
                     if self.direction.y > 0: 
                         self.hitbox_rect.bottom = sprite.rect.top
-
-                self.hitbox_rect.x -= self.direction.x * 2  
-                self.hitbox_rect.y -= self.direction.y * 2  
+                    self.position.y = self.hitbox_rect.centery
 
     def take_damage(self, amount):
         self.health -= amount
@@ -267,14 +263,12 @@ class Boss(pygame.sprite.Sprite):
             self.destroy()
 
     def destroy(self):
-        self.death_time = pygame.time.get_ticks()
+        self.death_time = get_ticks()
 
-        surf = pygame.mask.from_surface(self.frames[0]).to_surface()
-        surf.set_colorkey('black')
-        self.image = surf
+        self.image = get_silhouette(self.frames[0])
 
     def death_timer(self):
-        if pygame.time.get_ticks() - self.death_time >= self.death_duration:
+        if get_ticks() - self.death_time >= self.death_duration:
             self.kill()
 
     def update(self, dt):
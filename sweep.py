@@ -0,0 +1,93 @@
+from os import environ
+environ['SDL_VIDEODRIVER'] = 'dummy'
+environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import sys
+import csv
+import json
+from itertools import product
+from multiprocessing import Pool, cpu_count
+from statistics import mean
+from main import Game
+from controls import BotControls
+from atlas import load_atlas
+from mapcache import load_map
+from settings import *
+
+SWEEP_GRID = {
+    'enemy_speed': [80, 100, 140],
+    'spawn_interval': [600, 1000, 1400],
+    'wave_duration': [30, 60]
+}
+SWEEP_SEEDS = [1, 2, 3]
+SWEEP_DURATION = 600
+
+game = None
+
+def build_caches():
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    load_atlas()
+    load_map(join('data', 'maps', 'world2.tmx'))
+    pygame.quit()
+
+def start_worker():
+    global game
+    game = Game(headless = True, controls = BotControls())
+
+def simulate(job):
+    params, seed, duration = job
+    game.params = {**GAME_PARAMS, **params}
+    game.seed = seed
+    game.controls = BotControls(seed)
+    game.controls.attach(game)
+    game.reset()
+    return params, seed, game.run_headless(duration)
+
+def parameter_sets(grid):
+    unknown = set(grid) - set(GAME_PARAMS)
+    if unknown:
+        raise ValueError(f'Unknown parameters: {", ".join(sorted(unknown))}')
+    return [dict(zip(grid, values)) for values in product(*grid.values())]
+
+def aggregate(params, results):
+    survival = [stats['sim_time'] for stats in results]
+    return {
+        **params,
+        'runs': len(results),
+        'deaths': sum(stats['game_over'] for stats in results),
+        'mean_survival': mean(survival),
+        'min_survival': min(survival),
+        'max_survival': max(survival),
+        'mean_score': mean(stats['score'] for stats in results),
+        'mean_wave': mean(stats['wave'] for stats in results),
+        'peak_enemies': max(stats['peak_enemies'] for stats in results),
+        'peak_bullets': max(stats['peak_bullets'] for stats in results)
+    }
+
+def sweep(grid = SWEEP_GRID, seeds = SWEEP_SEEDS, duration = SWEEP_DURATION, processes = None):
+    sets = parameter_sets(grid)
+    jobs = [(params, seed, duration) for params in sets for seed in seeds]
+    results = {}
+    build_caches()
+    with Pool(processes or cpu_count(), initializer = start_worker) as pool:
+        for done, (params, seed, stats) in enumerate(pool.imap_unordered(simulate, jobs), 1):
+            results.setdefault(tuple(params.items()), []).append(stats)
+            print(f'[{done}/{len(jobs)}] {params} seed {seed}: survived {stats["sim_time"]:.1f}s, score {stats["score"]}, wave {stats["wave"]}')
+        pool.close()
+        pool.join()
+    return [aggregate(params, results[tuple(params.items())]) for params in sets]
+
+if __name__ == '__main__':
+    output_path = sys.argv[1] if len(sys.argv) > 1 else 'sweep.csv'
+    config = {}
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as file:
+            config = json.load(file)
+
+    rows = sweep(config.get('grid', SWEEP_GRID), config.get('seeds', SWEEP_SEEDS), config.get('duration', SWEEP_DURATION), config.get('processes'))
+    with open(output_path, 'w', newline = '') as file:
+        writer = csv.DictWriter(file, fieldnames = list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f'Wrote {output_path}')
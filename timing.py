@@ -0,0 +1,61 @@
+from settings import TICK_RATE
+from heapq import heappush, heappop
+
+class SimulationClock:
+    def __init__(self):
+        self.reset()
+
+    def advance(self, dt):
+        self.ticks += round(dt * TICK_RATE, 9)
+        self.time = self.ticks * 1000 / TICK_RATE
+
+    def reset(self):
+        self.ticks = 0
+        self.time = 0
+
+class Scheduler:
+    def __init__(self, clock):
+        self.clock = clock
+        self.events = []
+        self.counter = 0
+
+    def push(self, event):
+        event[1] = self.counter
+        self.counter += 1
+        heappush(self.events, event)
+        return event
+
+    def schedule(self, delay, callback, *args):
+        return self.push([self.clock.time + delay, 0, callback, args, None])
+
+    def repeat(self, interval, callback, *args):
+        return self.push([self.clock.time + interval, 0, callback, args, interval])
+
+    def cancel(self, event):
+        if event:
+            event[2] = None
+
+    def remaining(self, event):
+        return max(0, event[0] - self.clock.time)
+
+    def update(self):
+        while self.events and self.events[0][0] <= self.clock.time:
+            event = heappop(self.events)
+            deadline, _, callback, args, interval = event
+            if callback is None:
+                continue
+            if interval:
+                event[0] = deadline + interval
+                self.push(event)
+            callback(*args)
+
+    def clear(self):
+        for event in self.events:
+            event[2] = None
+        self.events.clear()
+
+simulation_clock = SimulationClock()
+scheduler = Scheduler(simulation_clock)
+
+def get_ticks():
+    return int(simulation_clock.time)
@@ -0,0 +1,146 @@
+from settings import *
+from collections import deque
+from threading import Thread, Condition
+from os import path, remove, replace
+import numpy as np
+import struct
+import sys
+
+CACHE_HEADER = struct.Struct('<4sIIIdd')
+CACHE_MAGIC = b'JHV1'
+
+def cache_path_for(video_path):
+    return video_path + '.raw'
+
+def open_cache(video_path, size):
+    cache_path = cache_path_for(video_path)
+    if not path.exists(cache_path) or not path.exists(video_path):
+        return None
+
+    with open(cache_path, 'rb') as file:
+        magic, width, height, frame_count, fps, mtime = CACHE_HEADER.unpack(file.read(CACHE_HEADER.size))
+    if magic != CACHE_MAGIC or (width, height) != tuple(size) or mtime != path.getmtime(video_path) or not frame_count:
+        return None
+
+    frames = np.memmap(cache_path, dtype = np.uint8, mode = 'r', offset = CACHE_HEADER.size, shape = (frame_count, height, width, 4))
+    return frames, fps
+
+def decode_frames(video_path, size):
+    from moviepy.editor import VideoFileClip
+
+    clip = VideoFileClip(video_path)
+    try:
+        for frame in clip.iter_frames(fps = clip.fps, dtype = 'uint8'):
+            surf = pygame.surfarray.make_surface(np.swapaxes(frame, 0, 1))
+            yield clip.fps, pygame.transform.scale(surf, size)
+    finally:
+        clip.close()
+
+class CacheWriter:
+    def __init__(self, video_path, size):
+        self.video_path = video_path
+        self.size = size
+        self.cache_path = cache_path_for(video_path)
+        self.file = open(self.cache_path + '.tmp', 'wb')
+        self.file.write(bytes(CACHE_HEADER.size))
+        self.frame_count = 0
+
+    def write(self, surf):
+        self.file.write(pygame.image.tobytes(surf, 'RGBX'))
+        self.frame_count += 1
+
+    def finish(self, fps):
+        self.file.seek(0)
+        self.file.write(CACHE_HEADER.pack(CACHE_MAGIC, self.size[0], self.size[1], self.frame_count, fps, path.getmtime(self.video_path)))
+        self.file.close()
+        replace(self.cache_path + '.tmp', self.cache_path)
+
+    def abort(self):
+        self.file.close()
+        remove(self.cache_path + '.tmp')
+
+def build_cache(video_path, size):
+    writer, fps = CacheWriter(video_path, size), 30
+    for fps, surf in decode_frames(video_path, size):
+        writer.write(surf)
+    writer.finish(fps)
+
+class VideoPlayer:
+    def __init__(self, video_path, size):
+        self.video_path = video_path
+        self.size = size
+        self.fps = 30
+        self.frame_surface = pygame.Surface(size)
+        self.frame_time = 0
+
+        self.cache = open_cache(video_path, size)
+        self.cache_index = 0
+        self.frames = deque(maxlen = VIDEO_BUFFER_SIZE)
+        self.condition = Condition()
+        self.running = True
+        self.thread = None
+        self.load_error = None
+
+        if self.cache:
+            self.fps = self.cache[1]
+        else:
+            self.thread = Thread(target = self.decode, daemon = True)
+            self.thread.start()
+
+    def decode(self):
+        writer = None
+        try:
+            writer = CacheWriter(self.video_path, self.size)
+            while self.running:
+                for fps, surf in decode_frames(self.video_path, self.size):
+                    self.fps = fps
+                    if writer:
+                        writer.write(surf)
+                    with self.condition:
+                        while self.running and len(self.frames) == self.frames.maxlen:
+                            self.condition.wait()
+                        if not self.running:
+                            break
+                        self.frames.append(surf)
+
+                if writer and self.running:
+                    writer.finish(self.fps)
+                    writer = None
+        except Exception as error:
+            self.load_error = error
+        finally:
+            if writer:
+                writer.abort()
+
+    def update(self, dt):
+        if self.load_error:
+            raise self.load_error
+        self.frame_time += dt
+        due = int(self.frame_time * self.fps)
+        if not due:
+            return
+        self.frame_time -= due / self.fps
+
+        if self.cache:
+            frames = self.cache[0]
+            self.cache_index = (self.cache_index + due) % len(frames)
+            self.frame_surface = pygame.image.frombuffer(frames[self.cache_index], self.size, 'RGBX')
+            return
+
+        with self.condition:
+            while due and self.frames:
+                self.frame_surface = self.frames.popleft()
+                due -= 1
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join()
+
+if __name__ == '__main__':
+    pygame.init()
+    video_path = sys.argv[1] if len(sys.argv) > 1 else join('menu', 'background.mp4')
+    build_cache(video_path, (WINDOW_WIDTH, WINDOW_HEIGHT))